@@ -46,8 +46,12 @@ Immediately before the program would run an instruction a second time, the value
 Run your copy of the boot code. Immediately before any instruction is executed a second time, what value is in the accumulator?
 """
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple, Optional, Sequence
 
-from typing import Callable, Sequence
+import sys
+import time
 
 
 class Result:
@@ -126,6 +130,161 @@ class Console:
         self.state.current += 1
 
 
+class Loop(NamedTuple):
+    entry: int
+    length: int
+    accumulator: int
+
+
+class TracingConsole(Console):
+    """
+    A Console that records where execution time goes.
+
+    Console itself is left untouched, so programs run without any
+    instrumentation cost unless they are run on a TracingConsole.
+
+    After each run:
+        hits holds how many times each instruction was executed, if count_hits is set.
+        trace holds the indexes of the last trace_length executed instructions.
+        loop describes the infinite loop the program was caught in, if any.
+    """
+
+    def __init__(
+        self,
+        state_factory: Callable[..., State] = State,
+        count_hits: bool = True,
+        trace_length: int = 0,
+    ):
+        super().__init__(state_factory)
+        self.count_hits = count_hits
+        self.trace_length = trace_length
+        self.hits: list[int] = []
+        self.trace: deque[int] = deque(maxlen=trace_length)
+        self.loop: Optional[Loop] = None
+        self.first_executed: dict[int, int] = {}
+
+    def run(self, program: Sequence[str]) -> Result:
+        self.hits = [0] * len(program) if self.count_hits else []
+        self.trace = deque(maxlen=self.trace_length)
+        self.first_executed = {}
+        self.loop = None
+        result = super().run(program)
+        if not result.is_success():
+            entry = self.state.current
+            self.loop = Loop(
+                entry=entry,
+                length=len(self.first_executed) - self.first_executed[entry],
+                accumulator=result.value,
+            )
+        return result
+
+    def evaluate(self, statement: str) -> None:
+        current = self.state.current
+        self.first_executed.setdefault(current, len(self.first_executed))
+        if self.count_hits:
+            self.hits[current] += 1
+        if self.trace_length:
+            self.trace.append(current)
+        super().evaluate(statement)
+
+    def hottest(self, count: int = 10) -> list[tuple[int, int]]:
+        """
+        Return up to count (instruction index, hits) pairs, most executed first.
+        """
+        ranked = sorted(enumerate(self.hits), key=lambda pair: pair[1], reverse=True)
+        return [(idx, hits) for (idx, hits) in ranked[:count] if hits]
+
+
+ACC = 0
+JMP = 1
+NOP = 2
+OPCODES = {"acc": ACC, "jmp": JMP, "nop": NOP}
+
+
+class Bytecode(NamedTuple):
+    opcodes: list[int]
+    operands: list[int]
+
+
+def compile_program(program: Sequence[str]) -> Bytecode:
+    """
+    Return the program decoded into parallel lists of opcodes and integer operands.
+    """
+    opcodes = []
+    operands = []
+    for statement in program:
+        operation, argument = statement.split(" ")
+        opcodes.append(OPCODES[operation])
+        operands.append(int(argument))
+    return Bytecode(opcodes=opcodes, operands=operands)
+
+
+def execute(bytecode: Bytecode) -> Result:
+    """
+    Run compiled bytecode with the same termination rules as Console.run.
+    """
+    opcodes, operands = bytecode
+    visited = bytearray(len(opcodes))
+    last = len(opcodes) - 1
+    acc_, jmp = ACC, JMP
+    accumulator = 0
+    current = 0
+    while True:
+        if visited[current]:
+            return Error(accumulator)
+        visited[current] = 1
+        opcode = opcodes[current]
+        if opcode == acc_:
+            accumulator += operands[current]
+            following = current + 1
+        elif opcode == jmp:
+            following = current + operands[current]
+        else:
+            following = current + 1
+        if current == last:
+            return Success(accumulator)
+        current = following
+
+
+def synthetic_program(length: int) -> list[str]:
+    """
+    Return a program that runs length - 1 instructions before looping back to the start.
+    """
+    cycle = ["acc +3", "nop +7", "jmp +1", "acc -2"]
+    program = [cycle[idx % len(cycle)] for idx in range(length - 2)]
+    program.append(f"jmp -{length - 2}")
+    program.append("acc +0")
+    return program
+
+
+def benchmark(lengths: Sequence[int] = (10_000, 100_000, 1_000_000)) -> None:
+    """
+    Report the instructions per second of Console.run and execute on synthetic programs.
+    """
+    for length in lengths:
+        program = synthetic_program(length)
+        executed = length - 1
+
+        start = time.perf_counter()
+        expected = Console().run(program)
+        console_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bytecode = compile_program(program)
+        compile_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = execute(bytecode)
+        execute_elapsed = time.perf_counter() - start
+
+        assert expected.value == actual.value
+        print(f"{length:,} instructions")
+        print(f"  Console.run: {executed / console_elapsed:,.0f} instructions/s")
+        print(
+            f"  execute:     {executed / execute_elapsed:,.0f} instructions/s"
+            f" (compiled in {compile_elapsed:.3f}s)"
+        )
+
+
 def part_two(program: Sequence[str]) -> int:
     program = list(program)
     for idx, line in enumerate(program):
@@ -144,6 +303,274 @@ def part_two(program: Sequence[str]) -> int:
     return -1
 
 
+class Repair(NamedTuple):
+    index: int
+    accumulator: int
+
+
+def find_repairs(program: Sequence[str]) -> list[Repair]:
+    """
+    Return every single jmp/nop flip that makes the program terminate, in execution order.
+
+    Only instructions on the original execution path can change the outcome, so
+    the path is walked once and each flip is checked against the set of
+    instructions that already reach the final instruction. That set and the
+    accumulator gained on the way there come from one walk of the reversed
+    control flow graph. Return an empty list if the program already terminates.
+    """
+    opcodes, operands = compile_program(program)
+    len_ = len(opcodes)
+    last = len_ - 1
+
+    def successor(idx: int, opcode: int) -> int:
+        return idx + operands[idx] if opcode == JMP else idx + 1
+
+    predecessors: list[list[int]] = [[] for _ in range(len_)]
+    for idx, opcode in enumerate(opcodes):
+        following = successor(idx, opcode)
+        # The final instruction terminates the program wherever it points.
+        if idx != last and 0 <= following < len_:
+            predecessors[following].append(idx)
+
+    # to_end[idx] is the accumulator gained by running from idx until termination,
+    # or None if idx never terminates.
+    to_end: list[Optional[int]] = [None] * len_
+    to_end[last] = operands[last] if opcodes[last] == ACC else 0
+    pending = [last]
+    while pending:
+        node = pending.pop()
+        for parent in predecessors[node]:
+            gained = operands[parent] if opcodes[parent] == ACC else 0
+            to_end[parent] = gained + to_end[node]
+            pending.append(parent)
+
+    repairs = []
+    visited = bytearray(len_)
+    accumulator = 0
+    current = 0
+    while not visited[current]:
+        if current == last:
+            return []
+        visited[current] = 1
+        opcode = opcodes[current]
+        if opcode != ACC:
+            flipped = successor(current, NOP if opcode == JMP else JMP)
+            if 0 <= flipped < len_ and to_end[flipped] is not None:
+                repairs.append(Repair(current, accumulator + to_end[flipped]))
+        else:
+            accumulator += operands[current]
+        current = successor(current, opcode)
+    return repairs
+
+
+def repair(program: Sequence[str]) -> Optional[Repair]:
+    """
+    Return the first single jmp/nop flip on the execution path that makes the program terminate.
+    """
+    repairs = find_repairs(program)
+    return repairs[0] if repairs else None
+
+
+Patches = dict[int, tuple[int, int]]
+NOT_EXECUTED = sys.maxsize
+
+
+class Snapshot(NamedTuple):
+    step: int
+    current: int
+    accumulator: int
+
+
+class Record(NamedTuple):
+    """
+    The execution of an unpatched program, kept so that variants can resume from any step of it.
+
+    path[step] is the index of the instruction executed at that step and
+    accumulators[step] is the accumulator just before it was executed.
+    first_step[idx] is the step at which instruction idx was executed, or NOT_EXECUTED.
+    """
+
+    path: list[int]
+    accumulators: list[int]
+    first_step: list[int]
+    result: Result
+
+    def snapshot(self, step: int) -> Snapshot:
+        return Snapshot(step, self.path[step], self.accumulators[step])
+
+
+def record_execution(bytecode: Bytecode) -> Record:
+    opcodes, operands = bytecode
+    first_step = [NOT_EXECUTED] * len(opcodes)
+    path: list[int] = []
+    accumulators: list[int] = []
+    last = len(opcodes) - 1
+    accumulator = 0
+    current = 0
+    while True:
+        if not 0 <= current < len(opcodes):
+            return Record(path, accumulators, first_step, Error(accumulator))
+        if first_step[current] != NOT_EXECUTED:
+            return Record(path, accumulators, first_step, Error(accumulator))
+        first_step[current] = len(path)
+        path.append(current)
+        accumulators.append(accumulator)
+        opcode = opcodes[current]
+        following = current + 1
+        if opcode == ACC:
+            accumulator += operands[current]
+        elif opcode == JMP:
+            following = current + operands[current]
+        if current == last:
+            return Record(path, accumulators, first_step, Success(accumulator))
+        current = following
+
+
+def compile_patches(patches: dict[int, str]) -> Patches:
+    """
+    Return replacement statements keyed by instruction index decoded into (opcode, operand) pairs.
+    """
+    rv = {}
+    for idx, statement in patches.items():
+        opcode, operand = compile_program([statement])
+        rv[idx] = (opcode[0], operand[0])
+    return rv
+
+
+def resume(
+    bytecode: Bytecode, patches: Patches, record: Record, snapshot: Snapshot
+) -> Result:
+    """
+    Continue running a patched program from a snapshot of the unpatched program.
+
+    The unpatched bytecode is never copied; patched instructions are looked up
+    first. Instructions executed before the snapshot count as visited without
+    copying any visited markers, and a jump outside the program is an Error.
+    """
+    opcodes, operands = bytecode
+    first_step = record.first_step
+    before = snapshot.step
+    visited = set()
+    len_ = len(opcodes)
+    last = len_ - 1
+    acc_, jmp = ACC, JMP
+    accumulator = snapshot.accumulator
+    current = snapshot.current
+    while True:
+        if not 0 <= current < len_:
+            return Error(accumulator)
+        if first_step[current] < before or current in visited:
+            return Error(accumulator)
+        visited.add(current)
+        if current in patches:
+            opcode, operand = patches[current]
+        else:
+            opcode, operand = opcodes[current], operands[current]
+        following = current + 1
+        if opcode == acc_:
+            accumulator += operand
+        elif opcode == jmp:
+            following = current + operand
+        if current == last:
+            return Success(accumulator)
+        current = following
+
+
+def run_variant(bytecode: Bytecode, patches: Patches, record: Record) -> Result:
+    """
+    Return the result of running the patched program, reusing the unpatched run up to the first patched instruction.
+    """
+    diverges_at = min((record.first_step[idx] for idx in patches), default=NOT_EXECUTED)
+    if diverges_at == NOT_EXECUTED:
+        return record.result
+    return resume(bytecode, patches, record, record.snapshot(diverges_at))
+
+
+_worker_program: tuple[Bytecode, Record]
+
+
+def _initialize_worker(bytecode: Bytecode, record: Record) -> None:
+    global _worker_program
+    _worker_program = (bytecode, record)
+
+
+def _run_batch(batch: Sequence[Patches]) -> list[Result]:
+    bytecode, record = _worker_program
+    return [run_variant(bytecode, patches, record) for patches in batch]
+
+
+def run_variants(
+    program: Sequence[str],
+    variants: Sequence[dict[int, str]],
+    processes: Optional[int] = None,
+    batch_size: int = 1_000,
+) -> list[Result]:
+    """
+    Return the result of each variant of the program, in order.
+
+    Each variant maps instruction indexes to replacement statements. The
+    unpatched program is run once and every variant resumes from the step where
+    it first executes a patched instruction. Batches of variants are fanned out
+    to a process pool, and each worker receives the program and its execution
+    record once. Pass processes=1 to run everything in this process.
+    """
+    bytecode = compile_program(program)
+    record = record_execution(bytecode)
+    compiled = [compile_patches(variant) for variant in variants]
+    if processes == 1:
+        return [run_variant(bytecode, patches, record) for patches in compiled]
+    batches = [
+        compiled[start : start + batch_size]
+        for start in range(0, len(compiled), batch_size)
+    ]
+    with ProcessPoolExecutor(
+        processes, initializer=_initialize_worker, initargs=(bytecode, record)
+    ) as pool:
+        return [result for batch in pool.map(_run_batch, batches) for result in batch]
+
+
+def flip(statement: str) -> str:
+    operation, argument = statement.split(" ")
+    return f"{'nop' if operation == 'jmp' else 'jmp'} {argument}"
+
+
+def benchmark_variants(length: int = 20_000, count: int = 2_000) -> None:
+    """
+    Compare running program variants from scratch against shared-prefix execution.
+    """
+    program = synthetic_program(length)
+    flippable = [
+        idx for (idx, statement) in enumerate(program) if "acc" not in statement
+    ]
+    step = max(len(flippable) // count, 1)
+    variants = [{idx: flip(program[idx])} for idx in flippable[::step][:count]]
+
+    start = time.perf_counter()
+    expected = []
+    for variant in variants:
+        patched = list(program)
+        for idx, statement in variant.items():
+            patched[idx] = statement
+        expected.append(execute(compile_program(patched)))
+    from_scratch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    serial = run_variants(program, variants, processes=1)
+    shared_prefix = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = run_variants(program, variants)
+    pooled = time.perf_counter() - start
+
+    summary = [(result.is_success(), result.value) for result in expected]
+    assert summary == [(result.is_success(), result.value) for result in serial]
+    assert summary == [(result.is_success(), result.value) for result in parallel]
+    print(f"{len(variants):,} variants of a {length:,} instruction program")
+    print(f"  From scratch:          {from_scratch:.3f}s")
+    print(f"  Shared prefix:         {shared_prefix:.3f}s")
+    print(f"  Shared prefix, pooled: {pooled:.3f}s")
+
+
 """
 --- Part Two ---
 
@@ -206,7 +633,68 @@ if __name__ == "__main__":
     expected = 8
     assert expected == actual
 
+    bytecode = compile_program(diagnostic)
+    assert bytecode.opcodes == [NOP, ACC, JMP, ACC, JMP, ACC, ACC, JMP, ACC]
+    assert bytecode.operands == [0, 1, 4, 3, -3, -99, 1, -4, 6]
+    result = execute(bytecode)
+    assert not result.is_success() and result.value == 5
+    repaired = list(diagnostic)
+    repaired[7] = "nop -4"
+    result = execute(compile_program(repaired))
+    assert result.is_success() and result.value == 8
+
+    console = TracingConsole(trace_length=3)
+    result = console.run(diagnostic)
+    assert not result.is_success() and result.value == 5
+    assert console.loop == Loop(entry=1, length=6, accumulator=5)
+    assert list(console.trace) == [7, 3, 4]
+    assert console.hits == [1, 1, 1, 1, 1, 0, 1, 1, 0]
+    assert console.hottest(2) == [(0, 1), (1, 1)]
+    console = TracingConsole(count_hits=False)
+    assert console.run(repaired).value == 8
+    assert console.loop is None and console.hits == [] and not console.trace
+
+    assert find_repairs(diagnostic) == [Repair(index=7, accumulator=8)]
+    assert repair(diagnostic) == Repair(index=7, accumulator=8)
+    assert find_repairs(repaired) == []
+
+    variants = [{7: "nop -4"}, {0: "jmp +0"}, {5: "acc +1"}, {2: "nop +4", 4: "nop -3"}]
+    results = [
+        (result.is_success(), result.value)
+        for result in run_variants(diagnostic, variants, processes=1)
+    ]
+    assert results == [(True, 8), (False, 0), (False, 5), (False, -94)]
+    assert results == [
+        (result.is_success(), result.value)
+        for result in run_variants(diagnostic, variants, processes=2, batch_size=1)
+    ]
+    assert find_repairs(["jmp +0", "nop +2", "acc +1"]) == [Repair(0, 1)]
+    for jump in ("jmp +5", "jmp -5"):
+        results = [
+            (result.is_success(), result.value)
+            for result in run_variants(
+                ["nop +0", jump, "acc +1"], [{}, {1: "nop +5"}], processes=1
+            )
+        ]
+        assert results == [(False, 0), (True, 1)]
+
     from input_eight import input_
 
     print("Part one: ", Console().run(input_).value)
-    print("Part two: ", part_two(input_))
\ No newline at end of file
+    print("Part two: ", part_two(input_))
+    assert repair(input_).accumulator == part_two(input_)
+    flips = [
+        {idx: flip(statement)}
+        for (idx, statement) in enumerate(input_)
+        if "acc" not in statement
+    ]
+    assert [
+        Repair(idx, result.value)
+        for (variant, result) in zip(flips, run_variants(input_, flips))
+        for idx in variant
+        if result.is_success()
+    ] == find_repairs(input_)
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        benchmark_variants()
@@ -92,8 +92,29 @@ At this point, something interesting happens: the chaos stabilizes and further a
 Simulate your seating area by applying the seating rules repeatedly until no seats change state. How many seats end up occupied?
 """
 
-from typing import Any, Callable, Optional, Sequence
-
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, repeat
+from multiprocessing import Barrier, Process, Value
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from operator import lshift, or_, sub
+from random import Random
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; NumpySeatingSimulator needs it.
+    np = None
+
+try:
+    from scipy.signal import convolve2d
+except ImportError:  # Without SciPy, adjacent counts are summed from shifted slices.
+    convolve2d = None
 
 FLOOR = "."
 EMPTY = "L"
@@ -243,6 +264,801 @@ def second_evolver(chart: Sequence[str]) -> Sequence[str]:
     return evolution
 
 
+DIRECTIONS = ((-1, 0), (1, 0), (-1, 1), (1, 1), (-1, -1), (1, -1), (0, -1), (0, 1))
+FLOOR_CELL = 0
+SEAT_CELL = 1
+BORDER_CELL = 2
+
+
+def rule_table(max_occupied: int) -> bytes:
+    """
+    Return a bytes.translate table from (occupied << 4) | occupied neighbours to the seat's next state.
+    """
+    table = bytearray(256)
+    table[0] = 1
+    for count in range(max_occupied):
+        table[(1 << 4) | count] = 1
+    return bytes(table)
+
+
+def evolve_adjacent(
+    current: Any,
+    evolution: Any,
+    seats: Sequence[int],
+    offsets: Sequence[int],
+    max_occupied: int = 4,
+) -> bool:
+    """
+    Write the next state of seats under the part one rules and return True if any changed.
+
+    current and evolution are flat byte buffers in the SeatingSimulator layout,
+    and offsets are the flat offsets of the eight adjacent positions.
+    """
+    north, south, north_east, south_east, north_west, south_west, west, east = offsets
+    changed = False
+    for idx in seats:
+        neighbours = (
+            current[idx + north]
+            + current[idx + south]
+            + current[idx + north_east]
+            + current[idx + south_east]
+            + current[idx + north_west]
+            + current[idx + south_west]
+            + current[idx + west]
+            + current[idx + east]
+        )
+        seat = current[idx]
+        if seat:
+            evolved = neighbours < max_occupied
+        else:
+            evolved = neighbours == 0
+        evolution[idx] = evolved
+        if evolved != seat:
+            changed = True
+    return changed
+
+
+def evolve_visible(
+    current: Any,
+    evolution: Any,
+    seats: Sequence[int],
+    starts: Sequence[int],
+    visible: Sequence[int],
+    max_occupied: int = 5,
+) -> bool:
+    """
+    Write the next state of seats under the part two rules and return True if any changed.
+
+    The seats visible from seats[k] are visible[starts[k] : starts[k + 1]].
+    Their states are gathered in one pass over the table, and each seat's
+    count is the difference of their prefix sums at its row bounds. The rules
+    are then a single bytes.translate over (occupied << 4) | count, which
+    leaves writing the next generation into evolution as the only per-seat
+    Python loop.
+    """
+    gathered = [0, *accumulate(map(current.__getitem__, visible))]
+    counts = map(
+        sub,
+        map(gathered.__getitem__, starts[1:]),
+        map(gathered.__getitem__, starts),
+    )
+    seated = bytes(map(current.__getitem__, seats))
+    keys = bytes(map(or_, map(lshift, seated, repeat(4)), counts))
+    evolved = keys.translate(rule_table(max_occupied))
+    for idx, seat in zip(seats, evolved):
+        evolution[idx] = seat
+    return evolved != seated
+
+
+class SeatingSimulator:
+    """
+    Simulate a seating chart stored in flat bytearrays with a one cell border.
+
+    Position (row_idx, col_idx) is stored at (row_idx + 1) * stride + col_idx + 1.
+    layout marks floor, seats and the border, and never changes. occupied holds
+    1 for an occupied seat and 0 otherwise, so counting occupied neighbours is a
+    sum of bytes and the border removes every bounds check. Each round writes
+    into a spare buffer, swaps it with occupied, and reports whether any seat
+    changed instead of comparing whole charts.
+    """
+
+    def __init__(self, chart: Sequence[str]):
+        self.height = len(chart)
+        self.width = len(chart[0]) if chart else 0
+        self.stride = self.width + 2
+        size = (self.height + 2) * self.stride
+        self.layout = bytearray([BORDER_CELL]) * size
+        self.initial = bytearray(size)
+        for row_idx, row in enumerate(chart):
+            start = (row_idx + 1) * self.stride + 1
+            for col_idx, seat in enumerate(row):
+                self.layout[start + col_idx] = (
+                    FLOOR_CELL if seat == FLOOR else SEAT_CELL
+                )
+                self.initial[start + col_idx] = seat == OCCUPIED
+        self.seats = [
+            idx for (idx, cell) in enumerate(self.layout) if cell == SEAT_CELL
+        ]
+        self.offsets = tuple(
+            row_delta * self.stride + col_delta for (row_delta, col_delta) in DIRECTIONS
+        )
+        self.occupied = bytearray(self.initial)
+        self._spare = bytearray(size)
+        self._visible: Optional[tuple[array, array]] = None
+
+    def reset(self) -> None:
+        self.occupied = bytearray(self.initial)
+
+    def step_adjacent(self, max_occupied: int = 4) -> bool:
+        """
+        Apply one round of the part one rules and return True if any seat changed.
+        """
+        current = self.occupied
+        evolution = self._spare
+        changed = evolve_adjacent(
+            current, evolution, self.seats, self.offsets, max_occupied
+        )
+        self.occupied, self._spare = evolution, current
+        return changed
+
+    def visible_seats(self) -> tuple[array, array]:
+        """
+        Return the seats visible from every seat as compressed sparse rows.
+
+        The seats visible from self.seats[k] are
+        neighbours[starts[k] : starts[k + 1]]. Floor never changes, so the table
+        is built once per chart. Each direction is swept in the order that visits
+        the next cell along it first, which finds the nearest seat for every
+        cell in one pass instead of casting a ray per seat.
+        """
+        if self._visible is None:
+            layout = self.layout
+            size = len(layout)
+            directions = len(self.offsets)
+            by_seat = array("q", [-1]) * (len(self.seats) * directions)
+            for direction, offset in enumerate(self.offsets):
+                nearest = array("q", [-1]) * size
+                order = range(size - 1, -1, -1) if offset > 0 else range(size)
+                for idx in order:
+                    if layout[idx] == BORDER_CELL:
+                        continue
+                    following = idx + offset
+                    cell = layout[following]
+                    if cell == SEAT_CELL:
+                        nearest[idx] = following
+                    elif cell == FLOOR_CELL:
+                        nearest[idx] = nearest[following]
+                for rank, idx in enumerate(self.seats):
+                    by_seat[rank * directions + direction] = nearest[idx]
+            starts = array("q", [0])
+            neighbours = array("q")
+            for rank in range(len(self.seats)):
+                for idx in by_seat[rank * directions : (rank + 1) * directions]:
+                    if idx >= 0:
+                        neighbours.append(idx)
+                starts.append(len(neighbours))
+            self._visible = (starts, neighbours)
+        return self._visible
+
+    def step_visible(self, max_occupied: int = 5) -> bool:
+        """
+        Apply one round of the part two rules and return True if any seat changed.
+        """
+        current = self.occupied
+        evolution = self._spare
+        starts, visible = self.visible_seats()
+        changed = evolve_visible(
+            current, evolution, self.seats, starts, visible, max_occupied
+        )
+        self.occupied, self._spare = evolution, current
+        return changed
+
+    def play(self, line_of_sight: bool = False, max_rounds: int = 10_000) -> int:
+        """
+        Return the number of occupied seats once the chart stops changing.
+
+        Each call starts over from the initial chart. Some charts oscillate
+        forever, so give up after max_rounds.
+        """
+        self.reset()
+        step = self.step_visible if line_of_sight else self.step_adjacent
+        for _ in range(max_rounds):
+            if not step():
+                return self.count_occupied()
+        raise RuntimeError(f"The chart did not settle within {max_rounds} rounds.")
+
+    def count_occupied(self) -> int:
+        return self.occupied.count(1)
+
+    def render(self) -> list[str]:
+        rv = []
+        for row_idx in range(self.height):
+            start = (row_idx + 1) * self.stride + 1
+            rv.append(
+                "".join(
+                    (
+                        FLOOR
+                        if self.layout[idx] == FLOOR_CELL
+                        else OCCUPIED if self.occupied[idx] else EMPTY
+                    )
+                    for idx in range(start, start + self.width)
+                )
+            )
+        return rv
+
+
+ADJACENT_KERNEL = ((1, 1, 1), (1, 0, 1), (1, 1, 1))
+
+
+class NumpySeatingSimulator(SeatingSimulator):
+    """
+    A SeatingSimulator that applies each round as NumPy array operations.
+
+    occupied is a flat uint8 array in the same padded layout, and it is
+    reshaped into a (height + 2, stride) grid without copying. Adjacent counts
+    come from a 3x3 convolution of that grid: scipy.signal.convolve2d when
+    SciPy is installed, and eight shifted slices summed otherwise. Visible
+    counts gather occupancy through a fixed-width table of the first seat seen
+    in each direction, built with one vectorized sweep per row or column
+    instead of per cell.
+    """
+
+    def __init__(self, chart: Sequence[str]):
+        if np is None:
+            raise ImportError("NumpySeatingSimulator requires NumPy.")
+        super().__init__(chart)
+        self.shape = (self.height + 2, self.stride)
+        self.seat_mask = np.frombuffer(self.layout, dtype=np.uint8) == SEAT_CELL
+        self.seat_indexes = np.flatnonzero(self.seat_mask)
+        self.occupied = np.frombuffer(self.initial, dtype=np.uint8).copy()
+        self._visible_table: Optional[Any] = None
+
+    def reset(self) -> None:
+        self.occupied = np.frombuffer(self.initial, dtype=np.uint8).copy()
+
+    def count_occupied(self) -> int:
+        return int(self.occupied.sum())
+
+    def adjacent_counts(self) -> Any:
+        """
+        Return the number of occupied neighbours of every position inside the border.
+        """
+        grid = self.occupied.reshape(self.shape)
+        if convolve2d is not None:
+            return convolve2d(grid, ADJACENT_KERNEL, mode="valid")
+        height, width = self.height, self.width
+        counts = np.zeros((height, width), dtype=np.uint8)
+        for row_delta, col_delta in DIRECTIONS:
+            counts += grid[
+                1 + row_delta : 1 + row_delta + height,
+                1 + col_delta : 1 + col_delta + width,
+            ]
+        return counts
+
+    def step_adjacent(self, max_occupied: int = 4) -> bool:
+        grid = self.occupied.reshape(self.shape)
+        seated = grid[1:-1, 1:-1]
+        counts = self.adjacent_counts()
+        evolved = np.where(seated == 1, counts < max_occupied, counts == 0)
+        evolved &= self.seat_mask.reshape(self.shape)[1:-1, 1:-1]
+        changed = bool((evolved != seated).any())
+        evolution = np.zeros(self.shape, dtype=np.uint8)
+        evolution[1:-1, 1:-1] = evolved
+        self.occupied = evolution.ravel()
+        return changed
+
+    def visible_table(self) -> Any:
+        """
+        Return the first seat visible in each direction from each seat, one row per seat.
+
+        Directions with no visible seat hold index 0, a border cell that is
+        never occupied, so each round is a single fixed-width gather.
+        """
+        if self._visible_table is None:
+            layout = np.frombuffer(self.layout, dtype=np.uint8).reshape(self.shape)
+            indexes = np.arange(layout.size).reshape(self.shape)
+            height, width = self.height, self.width
+            table = np.empty((len(self.seat_indexes), len(DIRECTIONS)), dtype=np.int64)
+            for direction, (row_delta, col_delta) in enumerate(DIRECTIONS):
+                nearest = np.zeros(self.shape, dtype=np.int64)
+                # Walk rows (or columns, for horizontal directions) so that the
+                # next cell along the direction is always resolved first.
+                if row_delta:
+                    rows = (
+                        range(height, 0, -1) if row_delta > 0 else range(1, height + 1)
+                    )
+                    lines = (
+                        (
+                            (row, slice(1, width + 1)),
+                            (
+                                row + row_delta,
+                                slice(1 + col_delta, width + 1 + col_delta),
+                            ),
+                        )
+                        for row in rows
+                    )
+                else:
+                    cols = range(width, 0, -1) if col_delta > 0 else range(1, width + 1)
+                    lines = (
+                        (
+                            (slice(1, height + 1), col),
+                            (slice(1, height + 1), col + col_delta),
+                        )
+                        for col in cols
+                    )
+                for line, following in lines:
+                    cells = layout[following]
+                    nearest[line] = np.where(
+                        cells == SEAT_CELL,
+                        indexes[following],
+                        np.where(cells == FLOOR_CELL, nearest[following], 0),
+                    )
+                table[:, direction] = nearest.ravel()[self.seat_indexes]
+            self._visible_table = table
+        return self._visible_table
+
+    def visible_seats(self) -> tuple[Any, Any]:
+        """
+        Return the same compressed sparse rows as SeatingSimulator.visible_seats, as NumPy arrays.
+        """
+        if self._visible is None:
+            table = self.visible_table()
+            found = table != 0
+            starts = np.zeros(len(table) + 1, dtype=np.int64)
+            np.cumsum(found.sum(axis=1), out=starts[1:])
+            self._visible = (starts, table[found])
+        return self._visible
+
+    def step_visible(self, max_occupied: int = 5) -> bool:
+        counts = self.occupied[self.visible_table()].sum(axis=1, dtype=np.uint8)
+        seated = self.occupied[self.seat_indexes]
+        evolved = np.where(seated == 1, counts < max_occupied, counts == 0)
+        changed = bool((evolved != seated).any())
+        evolution = np.zeros_like(self.occupied)
+        evolution[self.seat_indexes] = evolved
+        self.occupied = evolution
+        return changed
+
+
+class FrontierSeatingSimulator(SeatingSimulator):
+    """
+    A SeatingSimulator that only re-evaluates seats whose neighbourhood changed.
+
+    A seat whose neighbours all keep their states keeps its own, so after the
+    first round only the dependents of the seats that flipped can change: the
+    adjacent seats under the part one rules, and the seats that can see a
+    flipped seat under the part two rules (visibility is symmetric). Occupied
+    neighbour counts are kept per seat and adjusted as seats flip, and a chart
+    has settled once the frontier is empty. frontier_sizes records how many
+    seats each round evaluated since the counts were last started.
+    """
+
+    def __init__(self, chart: Sequence[str]):
+        super().__init__(chart)
+        self.rank_of = {idx: rank for (rank, idx) in enumerate(self.seats)}
+        self.counts = bytearray()
+        self.frontier: list[int] = []
+        self.frontier_sizes: list[int] = []
+        self._line_of_sight: Optional[bool] = None
+        self._dependents: dict[bool, list[tuple[int, ...]]] = {}
+
+    def reset(self) -> None:
+        super().reset()
+        self._line_of_sight = None
+
+    def dependents(self, line_of_sight: bool = False) -> list[tuple[int, ...]]:
+        """
+        Return the ranks of the seats whose counts include each seat, indexed by rank.
+        """
+        if line_of_sight not in self._dependents:
+            rank_of = self.rank_of
+            if line_of_sight:
+                starts, visible = self.visible_seats()
+                dependents = [
+                    tuple(
+                        rank_of[idx] for idx in visible[starts[rank] : starts[rank + 1]]
+                    )
+                    for rank in range(len(self.seats))
+                ]
+            else:
+                layout = self.layout
+                dependents = [
+                    tuple(
+                        rank_of[idx + offset]
+                        for offset in self.offsets
+                        if layout[idx + offset] == SEAT_CELL
+                    )
+                    for idx in self.seats
+                ]
+            self._dependents[line_of_sight] = dependents
+        return self._dependents[line_of_sight]
+
+    def start(self, line_of_sight: bool = False) -> None:
+        """
+        Count every seat's occupied neighbours and put every seat on the frontier.
+        """
+        states = bytes(map(self.occupied.__getitem__, self.seats))
+        self.counts = bytearray(
+            sum(map(states.__getitem__, ranks))
+            for ranks in self.dependents(line_of_sight)
+        )
+        self.frontier = list(range(len(self.seats)))
+        self.frontier_sizes = []
+        self._line_of_sight = line_of_sight
+
+    def step_frontier(self, line_of_sight: bool, max_occupied: int) -> bool:
+        """
+        Evaluate the seats on the frontier and return True if any seat changed.
+
+        Every seat on the frontier is decided from the counts of the previous
+        round before any of them flips, and the dependents of the seats that
+        flipped become the next frontier.
+        """
+        if self._line_of_sight != line_of_sight:
+            self.start(line_of_sight)
+        current = self.occupied
+        seats = self.seats
+        counts = self.counts
+        self.frontier_sizes.append(len(self.frontier))
+        flipped = []
+        for rank in self.frontier:
+            if current[seats[rank]]:
+                if counts[rank] >= max_occupied:
+                    flipped.append(rank)
+            elif not counts[rank]:
+                flipped.append(rank)
+        dependents = self._dependents[line_of_sight]
+        frontier = set()
+        for rank in flipped:
+            idx = seats[rank]
+            seat = current[idx] ^ 1
+            current[idx] = seat
+            ranks = dependents[rank]
+            if seat:
+                for dependent in ranks:
+                    counts[dependent] += 1
+            else:
+                for dependent in ranks:
+                    counts[dependent] -= 1
+            frontier.update(ranks)
+        self.frontier = list(frontier)
+        return bool(flipped)
+
+    def step_adjacent(self, max_occupied: int = 4) -> bool:
+        return self.step_frontier(False, max_occupied)
+
+    def step_visible(self, max_occupied: int = 5) -> bool:
+        return self.step_frontier(True, max_occupied)
+
+
+class TileTask(NamedTuple):
+    """
+    What one TiledSeatingSimulator worker needs to evolve rows [first_row, stop_row).
+
+    Under the part one rules seats are relative to the tile's copy, which
+    starts with the halo row above it. Under the part two rules seats are flat
+    indexes into the whole chart and starts and visible are the tile's rows of
+    the neighbour table.
+    """
+
+    buffer_names: tuple[str, str]
+    flags_name: str
+    tile: int
+    tiles: int
+    stride: int
+    first_row: int
+    stop_row: int
+    seats: Sequence[int]
+    offsets: Sequence[int]
+    line_of_sight: bool
+    starts: Sequence[int]
+    visible: Sequence[int]
+    max_occupied: int
+    max_rounds: int
+
+
+def _simulate_tile(task: TileTask, barrier: Any, rounds: Any) -> None:
+    """
+    Evolve one tile of a chart held in shared memory until no tile changes.
+
+    Generation g reads buffer g % 2 and writes buffer (g + 1) % 2, and each
+    tile sets its changed flag in the half of the flags for g % 2. Nothing
+    written in a generation is read or overwritten before every tile has
+    passed that generation's barrier, so one barrier per generation is
+    enough. The first tile records how many generations were run.
+    """
+    buffers = [SharedMemory(name=name) for name in task.buffer_names]
+    flags_memory = SharedMemory(name=task.flags_name)
+    views = [shared.buf for shared in buffers]
+    flags = flags_memory.buf
+    stride = task.stride
+    # Padded row first_row is the halo above the tile's first chart row.
+    first = task.first_row * stride
+    stop = (task.stop_row + 2) * stride
+    try:
+        for generation in range(task.max_rounds):
+            current = views[generation % 2]
+            evolution = views[(generation + 1) % 2]
+            if task.line_of_sight:
+                changed = evolve_visible(
+                    current,
+                    evolution,
+                    task.seats,
+                    task.starts,
+                    task.visible,
+                    task.max_occupied,
+                )
+            else:
+                tile = bytearray(current[first:stop])
+                evolved = bytearray(len(tile))
+                changed = evolve_adjacent(
+                    tile, evolved, task.seats, task.offsets, task.max_occupied
+                )
+                evolution[first + stride : stop - stride] = evolved[stride:-stride]
+            parity = generation % 2 * task.tiles
+            flags[parity + task.tile] = changed
+            barrier.wait()
+            if not any(flags[parity : parity + task.tiles]):
+                if task.tile == 0:
+                    rounds.value = generation + 1
+                return
+    except BaseException:
+        # Release the other tiles from the barrier instead of leaving them waiting.
+        barrier.abort()
+        raise
+    finally:
+        for shared in (*buffers, flags_memory):
+            shared.close()
+
+
+class TiledSeatingSimulator(SeatingSimulator):
+    """
+    A SeatingSimulator that plays a chart in a process per horizontal tile.
+
+    Both generations of the chart live in shared memory. Under the part one
+    rules each worker copies its tile together with a one row halo above and
+    below, evolves the copy and writes its rows back. Under the part two rules
+    a tile's seats can see any row, so each worker gathers from the whole
+    previous generation through its rows of the neighbour table. Workers meet
+    at a barrier after every generation and stop once no tile has changed.
+    step_adjacent and step_visible still evolve the chart in this process.
+    """
+
+    def __init__(self, chart: Sequence[str], processes: Optional[int] = None):
+        super().__init__(chart)
+        self.processes = processes or os.cpu_count() or 1
+
+    def tiles(self) -> list[tuple[int, int]]:
+        """
+        Return the [first_row, stop_row) bounds of each tile.
+        """
+        count = min(self.processes, self.height)
+        return [
+            (self.height * tile // count, self.height * (tile + 1) // count)
+            for tile in range(count)
+        ]
+
+    def tile_tasks(
+        self,
+        buffer_names: tuple[str, str],
+        flags_name: str,
+        line_of_sight: bool,
+        max_occupied: int,
+        max_rounds: int,
+    ) -> list[TileTask]:
+        tiles = self.tiles()
+        stride = self.stride
+        starts, visible = self.visible_seats() if line_of_sight else ([0], [])
+        tasks = []
+        for tile, (first_row, stop_row) in enumerate(tiles):
+            low = bisect_left(self.seats, (first_row + 1) * stride)
+            high = bisect_left(self.seats, (stop_row + 1) * stride)
+            seats = self.seats[low:high]
+            if line_of_sight:
+                tile_starts = array(
+                    "q", (start - starts[low] for start in starts[low : high + 1])
+                )
+                tile_visible = visible[starts[low] : starts[high]]
+            else:
+                seats = [idx - first_row * stride for idx in seats]
+                tile_starts, tile_visible = array("q", [0]), array("q")
+            tasks.append(
+                TileTask(
+                    buffer_names,
+                    flags_name,
+                    tile,
+                    len(tiles),
+                    stride,
+                    first_row,
+                    stop_row,
+                    seats,
+                    self.offsets,
+                    line_of_sight,
+                    tile_starts,
+                    tile_visible,
+                    max_occupied,
+                    max_rounds,
+                )
+            )
+        return tasks
+
+    def run(self, line_of_sight: bool = False, max_rounds: int = 10_000) -> bool:
+        """
+        Evolve the current chart until it stops changing, for at most max_rounds, and return True if it settled.
+        """
+        if not self.seats:
+            return True
+        size = len(self.layout)
+        buffers = [SharedMemory(create=True, size=size) for _ in range(2)]
+        flags = SharedMemory(create=True, size=2 * len(self.tiles()))
+        try:
+            buffers[0].buf[:size] = self.occupied
+            buffers[1].buf[:size] = bytes(size)
+            flags.buf[: flags.size] = bytes(flags.size)
+            tasks = self.tile_tasks(
+                (buffers[0].name, buffers[1].name),
+                flags.name,
+                line_of_sight,
+                5 if line_of_sight else 4,
+                max_rounds,
+            )
+            barrier = Barrier(len(tasks))
+            rounds = Value("q", 0)
+            workers = [
+                Process(target=_simulate_tile, args=(task, barrier, rounds))
+                for task in tasks
+            ]
+            for worker in workers:
+                worker.start()
+            running = workers
+            while running:
+                wait([worker.sentinel for worker in running])
+                running = [worker for worker in running if worker.is_alive()]
+                if any(worker.exitcode for worker in workers):
+                    # A worker killed outright never aborts the barrier, so
+                    # release and stop the other tiles instead of waiting forever.
+                    barrier.abort()
+                    for worker in running:
+                        worker.terminate()
+                    for worker in running:
+                        worker.join()
+                    raise RuntimeError("A tile worker failed.")
+            settled = rounds.value
+            self.occupied[:] = buffers[(settled or max_rounds) % 2].buf[:size]
+            return bool(settled)
+        finally:
+            for shared in (*buffers, flags):
+                shared.close()
+                shared.unlink()
+
+    def play(self, line_of_sight: bool = False, max_rounds: int = 10_000) -> int:
+        self.reset()
+        if not self.run(line_of_sight, max_rounds):
+            raise RuntimeError(f"The chart did not settle within {max_rounds} rounds.")
+        return self.count_occupied()
+
+
+def random_chart(
+    height: int, width: int, floor_rate: float = 0.1, seed: int = 0
+) -> list[str]:
+    random = Random(seed)
+    return [
+        "".join(FLOOR if random.random() < floor_rate else EMPTY for _ in range(width))
+        for _ in range(height)
+    ]
+
+
+def benchmark(
+    sizes: Sequence[int] = (25, 50, 100),
+    large: int = 1_000,
+    huge: int = 3_000,
+    rounds: int = 10,
+) -> None:
+    """
+    Time rounds generations of the evolvers and of each simulator on random square charts.
+
+    Random charts do not always reach equilibrium, so a fixed number of
+    generations is timed instead of play. The evolvers only run on the small
+    charts and NumpySeatingSimulator, when NumPy is installed, is the only one
+    run on the huge chart. Simulator times include building the neighbour table.
+    """
+    simulators: list[type[SeatingSimulator]] = [
+        SeatingSimulator,
+        FrontierSeatingSimulator,
+    ]
+    if np is not None:
+        simulators.append(NumpySeatingSimulator)
+
+    def time_rounds(
+        simulator_type: type[SeatingSimulator],
+        chart: Sequence[str],
+        line_of_sight: bool,
+    ) -> tuple[float, SeatingSimulator]:
+        start = time.perf_counter()
+        simulator = simulator_type(chart)
+        step = simulator.step_visible if line_of_sight else simulator.step_adjacent
+        for _ in range(rounds):
+            step()
+        return time.perf_counter() - start, simulator
+
+    rulesets = (("adjacent", first_evolver, False), ("visible ", second_evolver, True))
+    for size in sizes:
+        chart = random_chart(size, size)
+        print(f"{size:,}x{size:,} chart, {rounds} rounds")
+        for label, evolver, line_of_sight in rulesets:
+            start = time.perf_counter()
+            expected = chart
+            for _ in range(rounds):
+                expected = evolver(expected)
+            timings = [f"evolver {time.perf_counter() - start:.3f}s"]
+            for simulator_type in simulators:
+                elapsed, simulator = time_rounds(simulator_type, chart, line_of_sight)
+                assert expected == simulator.render()
+                timings.append(f"{simulator_type.__name__} {elapsed:.3f}s")
+            print(f"  {label}: {', '.join(timings)}")
+
+    for size, sized_simulators in ((large, simulators), (huge, simulators[2:])):
+        if not sized_simulators:
+            continue
+        chart = random_chart(size, size)
+        print(f"{size:,}x{size:,} chart, {rounds} rounds")
+        for label, _, line_of_sight in rulesets:
+            timings = []
+            for simulator_type in sized_simulators:
+                elapsed, _ = time_rounds(simulator_type, chart, line_of_sight)
+                timings.append(f"{simulator_type.__name__} {elapsed:.3f}s")
+            print(f"  {label}: {', '.join(timings)}")
+
+
+def benchmark_frontier(chart: Sequence[str]) -> None:
+    """
+    Time playing chart to equilibrium with and without a frontier, and show how the frontier shrinks.
+    """
+    for line_of_sight in (False, True):
+        label = "visible " if line_of_sight else "adjacent"
+        timings = []
+        for simulator_type in (SeatingSimulator, FrontierSeatingSimulator):
+            simulator = simulator_type(chart)
+            start = time.perf_counter()
+            simulator.play(line_of_sight=line_of_sight)
+            timings.append(
+                f"{simulator_type.__name__} {time.perf_counter() - start:.3f}s"
+            )
+        print(f"{label}: {', '.join(timings)}")
+        sizes = simulator.frontier_sizes
+        print(
+            f"  {len(sizes)} rounds, {sum(sizes):,} of {len(sizes) * len(simulator.seats):,}"
+            f" seat evaluations, frontier sizes {sizes}"
+        )
+
+
+def benchmark_tiled(
+    size: int = 1_000, rounds: int = 10, processes: Optional[int] = None
+) -> None:
+    """
+    Time rounds generations of a random square chart in one process and in tiles.
+    """
+    chart = random_chart(size, size)
+    tiled = TiledSeatingSimulator(chart, processes)
+    print(f"{size:,}x{size:,} chart, {rounds} rounds, {len(tiled.tiles())} tiles")
+    for line_of_sight in (False, True):
+        simulator = SeatingSimulator(chart)
+        step = simulator.step_visible if line_of_sight else simulator.step_adjacent
+        start = time.perf_counter()
+        for _ in range(rounds):
+            step()
+        serial = time.perf_counter() - start
+        tiled.reset()
+        start = time.perf_counter()
+        tiled.run(line_of_sight, rounds)
+        parallel = time.perf_counter() - start
+        assert simulator.render() == tiled.render()
+        label = "visible " if line_of_sight else "adjacent"
+        print(
+            f"  {label}: SeatingSimulator {serial:.3f}s, TiledSeatingSimulator {parallel:.3f}s"
+        )
+
+
 """
 --- Part Two ---
 
@@ -396,7 +1212,73 @@ if __name__ == "__main__":
     verify(37, play(diagnostic))
 
     verify(26, play(diagnostic, second_evolver))
+
+    simulator = SeatingSimulator(diagnostic)
+    verify(diagnostic, simulator.render())
+    verify(True, simulator.step_adjacent())
+    verify(one_round, simulator.render())
+    verify(37, simulator.play())
+    verify(26, simulator.play(line_of_sight=True))
+    verify(0, SeatingSimulator([]).play())
+    if np is not None:
+        simulator = NumpySeatingSimulator(diagnostic)
+        verify(True, simulator.step_adjacent())
+        verify(one_round, simulator.render())
+        verify(37, simulator.play())
+        verify(26, simulator.play(line_of_sight=True))
+    simulator = FrontierSeatingSimulator(diagnostic)
+    verify(True, simulator.step_adjacent())
+    verify(one_round, simulator.render())
+    verify(37, simulator.play())
+    verify(len(simulator.seats), simulator.frontier_sizes[0])
+    verify([], simulator.frontier)
+    verify(26, simulator.play(line_of_sight=True))
+    for processes in (1, 3, 20):
+        simulator = TiledSeatingSimulator(diagnostic, processes)
+        verify(False, simulator.run(max_rounds=1))
+        verify(one_round, simulator.render())
+        verify(37, simulator.play())
+        verify(26, simulator.play(line_of_sight=True))
+    verify(0, TiledSeatingSimulator([]).play())
+    # Flat indexes use a stride of 5: row 0 holds 7, row 1 holds 11 and 13,
+    # and row 2 holds 16, 17 and 18.
+    simulator = SeatingSimulator([".L.", "L.L", "LLL"])
+    starts, visible = simulator.visible_seats()
+    verify([7, 11, 13, 16, 17, 18], simulator.seats)
+    verify(
+        [
+            {11, 13, 17},
+            {7, 13, 16, 17},
+            {7, 11, 17, 18},
+            {11, 17},
+            {7, 11, 13, 16, 18},
+            {13, 17},
+        ],
+        [set(visible[starts[rank] : starts[rank + 1]]) for rank in range(6)],
+    )
+
     from input_eleven import input_
 
     print("Part one: ", play(input_))
     print("Part two: ", play(input_, second_evolver))
+    simulator = SeatingSimulator(input_)
+    verify(play(input_), simulator.play())
+    verify(play(input_, second_evolver), simulator.play(line_of_sight=True))
+    simulator = TiledSeatingSimulator(input_, processes=4)
+    verify(play(input_), simulator.play())
+    verify(play(input_, second_evolver), simulator.play(line_of_sight=True))
+    simulator = FrontierSeatingSimulator(input_)
+    verify(play(input_), simulator.play())
+    verify(play(input_, second_evolver), simulator.play(line_of_sight=True))
+    if np is not None:
+        simulator = NumpySeatingSimulator(input_)
+        verify(play(input_), simulator.play())
+        verify(play(input_, second_evolver), simulator.play(line_of_sight=True))
+        starts, visible = SeatingSimulator(input_).visible_seats()
+        verify(list(starts), simulator.visible_seats()[0].tolist())
+        verify(list(visible), simulator.visible_seats()[1].tolist())
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        benchmark_frontier(input_)
+        benchmark_tiled()
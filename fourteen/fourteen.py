@@ -43,7 +43,12 @@ To initialize your ferry's docking program, you need the sum of all values left
 Execute the initialization program. What is the sum of all values left in memory after it completes?
 """
 
-from typing import Any, Sequence
+from random import Random
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Sequence, Union
+
+import re
+import sys
+import time
 
 
 def initialize(program: Sequence[str]) -> int:
@@ -69,6 +74,120 @@ def apply_mask(mask: str, value: str) -> str:
     )
 
 
+MASK_BITS = 36
+INSTRUCTION = re.compile(r"\s*(?:mask\s*=\s*([01X]{36})|mem\[(\d+)\]\s*=\s*(\d+))\s*")
+
+
+class Mask(NamedTuple):
+    """
+    A mask line compiled into integers.
+
+    value & and_mask | or_mask applies the mask to a value: and_mask keeps the
+    bits under an X and or_mask sets the bits under a 1. floating_mask holds
+    the bits under an X, which the version 2 decoder lets float; it equals
+    and_mask, but names what the version 2 decoder uses it for.
+    """
+
+    and_mask: int
+    or_mask: int
+    floating_mask: int
+
+
+class Write(NamedTuple):
+    address: int
+    value: int
+
+
+def compile_mask(mask: str) -> Mask:
+    floating = int(mask.replace("1", "0").replace("X", "1"), 2)
+    return Mask(
+        and_mask=floating,
+        or_mask=int(mask.replace("X", "0"), 2),
+        floating_mask=floating,
+    )
+
+
+UNMASKED = compile_mask("X" * MASK_BITS)
+
+
+def parse_program(program: Iterable[str]) -> Iterator[Union[Mask, Write]]:
+    """
+    Yield each line of program as a compiled Mask or a Write, matching every line with one regular expression.
+    """
+    for line in program:
+        match = INSTRUCTION.fullmatch(line)
+        if match is None:
+            raise ValueError(f"Invalid instruction: {line}")
+        mask, address, value = match.groups()
+        if mask is None:
+            yield Write(int(address), int(value))
+        else:
+            yield compile_mask(mask)
+
+
+def execute(program: Iterable[str]) -> int:
+    """
+    Return the same sum as initialize, applying each compiled mask with two integer operations.
+
+    This inlines parse_program, since building a Write per line costs about
+    as much as the write itself.
+    """
+    memory = {}
+    and_mask, or_mask, _ = UNMASKED
+    match_instruction = INSTRUCTION.fullmatch
+    for line in program:
+        match = match_instruction(line)
+        if match is None:
+            raise ValueError(f"Invalid instruction: {line}")
+        mask, address, value = match.groups()
+        if mask is None:
+            memory[int(address)] = int(value) & and_mask | or_mask
+        else:
+            and_mask, or_mask, _ = compile_mask(mask)
+    return sum(memory.values())
+
+
+def random_program(
+    length: int,
+    writes_per_mask: int = 8,
+    floating_bits: int = 9,
+    address_bits: int = 16,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Return a random program of length lines, with a new mask every writes_per_mask writes.
+    """
+    random = Random(seed)
+    program = []
+    while len(program) < length:
+        mask = [random.choice("01") for _ in range(MASK_BITS)]
+        for idx in random.sample(range(MASK_BITS), floating_bits):
+            mask[idx] = "X"
+        program.append(f"mask = {''.join(mask)}")
+        for _ in range(min(writes_per_mask, length - len(program))):
+            address = random.getrandbits(address_bits)
+            program.append(f"mem[{address}] = {random.getrandbits(MASK_BITS)}")
+    return program
+
+
+def benchmark(length: int = 2 * 10**6) -> None:
+    """
+    Report the throughput of initialize and execute on a program of length lines.
+    """
+    program = random_program(length)
+    start = time.perf_counter()
+    expected = initialize(program)
+    by_strings = time.perf_counter() - start
+    start = time.perf_counter()
+    assert expected == execute(program)
+    by_integers = time.perf_counter() - start
+    print(
+        f"{length:,} lines: initialize {by_strings:.3f}s"
+        f" ({length / by_strings:,.0f} lines/s), execute {by_integers:.3f}s"
+        f" ({length / by_integers:,.0f} lines/s)"
+    )
+
+
 """
 --- Part Two ---
 
@@ -127,24 +246,37 @@ Execute the initialization program using an emulator for a version 2 decoder chi
 
 def initialize_version_two(program: Sequence[str]) -> int:
     memory = {}
-    mask = ""
-    for instruction in program:
-        action, value = instruction.split("=")
-        action = action.strip()
-        value = value.strip()
-        if action == "mask":
-            mask = value
+    mask = compile_mask("0" * MASK_BITS)
+    for instruction in parse_program(program):
+        if isinstance(instruction, Write):
+            value = instruction.value
+            for address in floating_addresses(instruction.address, mask):
+                memory[address] = value
         else:
-            value = int(value)
-            initial_location = format(
-                int(action.replace("mem[", "").replace("]", "")), "b"
-            ).zfill(36)
-            locations = determine_addresses(mask, initial_location)
-            for location in locations:
-                memory[location] = value
+            mask = instruction
     return sum(value for value in memory.values())
 
 
+def floating_addresses(address: int, mask: Mask) -> Iterator[int]:
+    """
+    Lazily yield every address a version 2 decoder writes to, as integers.
+
+    The written addresses share their fixed bits and differ in exactly the
+    floating bits, so they are the fixed bits combined with each submask of
+    floating_mask. sub = (sub - 1) & floating_mask steps from one submask to
+    the next smaller one, which visits all 2 ** k of them with one subtraction
+    and one and each.
+    """
+    floating = mask.floating_mask
+    fixed = (address | mask.or_mask) & ~floating
+    sub = floating
+    while True:
+        yield fixed | sub
+        if not sub:
+            return
+        sub = (sub - 1) & floating
+
+
 def determine_addresses(mask: str, initial: str) -> Sequence[int]:
     masked = apply_floating_mask(mask, initial)
     addresses = [""]
@@ -161,6 +293,176 @@ def determine_addresses(mask: str, initial: str) -> Sequence[int]:
     return [int(address, 2) for address in addresses]
 
 
+class Pattern(NamedTuple):
+    """
+    A ternary address pattern: every address that matches fixed outside the floating bits.
+
+    fixed is 0 under every floating bit, so two patterns are equal exactly
+    when they describe the same addresses.
+    """
+
+    fixed: int
+    floating: int
+
+    @property
+    def size(self) -> int:
+        return 1 << bin(self.floating).count("1")
+
+    def intersection(self, other: "Pattern") -> Optional["Pattern"]:
+        """
+        Return the addresses in both patterns, or None if they share none.
+        """
+        if (self.fixed ^ other.fixed) & ~self.floating & ~other.floating:
+            return None
+        floating = self.floating & other.floating
+        return Pattern((self.fixed | other.fixed) & ~floating, floating)
+
+    def contains(self, other: "Pattern") -> bool:
+        return not (other.floating & ~self.floating) and not (
+            (self.fixed ^ other.fixed) & ~self.floating
+        )
+
+
+def write_pattern(address: int, mask: Mask) -> Pattern:
+    """
+    Return the addresses a version 2 decoder writes to as a single pattern.
+    """
+    floating = mask.floating_mask
+    return Pattern((address | mask.or_mask) & ~floating, floating)
+
+
+def count_uncovered(pattern: Pattern, covering: Iterable[Pattern]) -> int:
+    """
+    Return how many addresses in pattern no pattern in covering contains.
+
+    Only the overlaps of pattern with covering matter, and an overlap inside
+    another overlap adds nothing to their union, so just the largest ones
+    are kept. Their union is the disjoint union of each overlap minus the
+    overlaps before it, which is the same count one level down on a smaller
+    pattern. Counting the union of patterns is hard in general, so the cost
+    grows quickly when many overlaps partly cover each other.
+    """
+    overlaps: list[Pattern] = []
+    for other in covering:
+        overlap = pattern.intersection(other)
+        if overlap is None:
+            continue
+        if overlap == pattern:
+            return 0
+        if any(kept.contains(overlap) for kept in overlaps):
+            continue
+        overlaps = [kept for kept in overlaps if not overlap.contains(kept)]
+        overlaps.append(overlap)
+    count = pattern.size
+    for idx, overlap in enumerate(overlaps):
+        count -= count_uncovered(overlap, overlaps[:idx])
+    return count
+
+
+class SymbolicMemory:
+    """
+    Version 2 decoder memory that stores each write as a pattern instead of one entry per address.
+
+    A write of k floating bits costs one Pattern rather than 2 ** k
+    dictionary entries. The final sum walks the writes from last to first:
+    the addresses of a write that no later write covers keep its value, so
+    each write only counts the addresses left after subtracting the patterns
+    of later writes.
+    """
+
+    def __init__(self) -> None:
+        self.writes: list[tuple[Pattern, int]] = []
+
+    def write(self, address: int, mask: Mask, value: int) -> None:
+        self.writes.append((write_pattern(address, mask), value))
+
+    def uncovered(self) -> Iterator[tuple[Pattern, int]]:
+        """
+        Yield each write's pattern with the number of its addresses that no later write covers, last write first.
+        """
+        later: list[Pattern] = []
+        for pattern, _ in reversed(self.writes):
+            yield pattern, count_uncovered(pattern, later)
+            later.append(pattern)
+
+    def total(self) -> int:
+        return sum(
+            value * count
+            for ((_, value), (_, count)) in zip(reversed(self.writes), self.uncovered())
+        )
+
+
+def initialize_symbolic(program: Iterable[str]) -> int:
+    """
+    Return the same sum as initialize_version_two without writing individual addresses.
+    """
+    memory = SymbolicMemory()
+    mask = compile_mask("0" * MASK_BITS)
+    for instruction in parse_program(program):
+        if isinstance(instruction, Write):
+            memory.write(instruction.address, mask, instruction.value)
+        else:
+            mask = instruction
+    return memory.total()
+
+
+def benchmark_symbolic(
+    writes: int = 1_000, floating_bits: Sequence[int] = (10, 20, 24)
+) -> None:
+    """
+    Time initialize_symbolic on programs with floating_bits floating bits per mask.
+
+    initialize_version_two writes 2 ** k dictionary entries per write, so it
+    is only run while that stays small.
+    """
+    for bits in floating_bits:
+        program = random_program(writes * 9 // 8, floating_bits=bits)
+        start = time.perf_counter()
+        total = initialize_symbolic(program)
+        symbolic = time.perf_counter() - start
+        timings = [f"initialize_symbolic {symbolic:.3f}s"]
+        if bits <= 12:
+            start = time.perf_counter()
+            assert total == initialize_version_two(program)
+            timings.insert(
+                0, f"initialize_version_two {time.perf_counter() - start:.3f}s"
+            )
+        print(f"{writes:,} writes with {bits} floating bits: {', '.join(timings)}")
+
+
+def benchmark_floating(writes: int = 10**4, floating_bits: int = 9) -> None:
+    """
+    Time expanding writes with determine_addresses against floating_addresses.
+    """
+    program = random_program(writes * 9 // 8, floating_bits=floating_bits)
+    masks_and_writes = []
+    mask = ""
+    for line in program:
+        if line.startswith("mask"):
+            mask = line.split(" = ")[1]
+        else:
+            address = int(line[4 : line.index("]")])
+            masks_and_writes.append((mask, address))
+    start = time.perf_counter()
+    by_strings = sum(
+        len(determine_addresses(mask, format(address, "b").zfill(MASK_BITS)))
+        for (mask, address) in masks_and_writes
+    )
+    strings = time.perf_counter() - start
+    compiled = [(compile_mask(mask), address) for (mask, address) in masks_and_writes]
+    start = time.perf_counter()
+    by_submasks = sum(
+        1 for (mask, address) in compiled for _ in floating_addresses(address, mask)
+    )
+    submasks = time.perf_counter() - start
+    assert by_strings == by_submasks
+    print(
+        f"{len(masks_and_writes):,} writes with {floating_bits} floating bits:"
+        f" determine_addresses {strings:.3f}s, floating_addresses {submasks:.3f}s"
+        f" ({by_submasks / submasks:,.0f} addresses/s)"
+    )
+
+
 def apply_floating_mask(mask: str, initial: str) -> str:
     masked = []
     for mask_char, initial_char in zip(mask, initial):
@@ -185,6 +487,26 @@ if __name__ == "__main__":
         "mem[8] = 0",
     ]
     verify(165, initialize(diagnostic))
+    verify(165, execute(diagnostic))
+    mask = compile_mask("XXXXXXXXXXXXXXXXXXXXXXXXXXXXX1XXXX0X")
+    verify(0b1000010, mask.and_mask ^ (2**MASK_BITS - 1))
+    verify(64, mask.or_mask)
+    verify(mask.and_mask, mask.floating_mask)
+    verify(
+        [mask, Write(8, 11), Write(7, 101), Write(8, 0)],
+        list(parse_program(diagnostic)),
+    )
+    verify([Write(8, 11)], list(parse_program(["mem[8]=11"])))
+    for invalid in ("mem[8] = -1", "mask = X1", "mem 8 = 11"):
+        try:
+            list(parse_program([invalid]))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{invalid} was parsed")
+    program = random_program(1_000, seed=1)
+    verify(initialize(program), execute(program))
+    verify(0, execute([]))
     diagnostic_version_two = [
         "mask = 000000000000000000000000000000X1001X",
         "mem[42] = 100",
@@ -192,8 +514,69 @@ if __name__ == "__main__":
         "mem[26] = 1",
     ]
     verify(208, initialize_version_two(diagnostic_version_two))
+    mask = compile_mask("000000000000000000000000000000X1001X")
+    verify([59, 58, 27, 26], list(floating_addresses(42, mask)))
+    verify(
+        sorted(
+            determine_addresses(
+                "00000000000000000000000000000000X0XX", format(26, "b").zfill(36)
+            )
+        ),
+        sorted(
+            floating_addresses(26, compile_mask("00000000000000000000000000000000X0XX"))
+        ),
+    )
+    verify([26], list(floating_addresses(26, compile_mask("0" * MASK_BITS))))
+    for mask, address in (("X00101" * 6, 12345), ("1X0000" * 6, 2**35 + 7)):
+        verify(
+            sorted(determine_addresses(mask, format(address, "b").zfill(MASK_BITS))),
+            sorted(floating_addresses(address, compile_mask(mask))),
+        )
+
+    verify(208, initialize_symbolic(diagnostic_version_two))
+    verify(
+        Pattern(0b11010, 0b100001),
+        write_pattern(42, compile_mask("000000000000000000000000000000X1001X")),
+    )
+    verify(4, Pattern(0b11010, 0b100001).size)
+    verify(None, Pattern(0b11010, 0).intersection(Pattern(0b1, 0b1)))
+    # 1X0X and 10XX share 100X.
+    verify(
+        Pattern(0b1000, 0b1), Pattern(0b1000, 0b101).intersection(Pattern(0b1000, 0b11))
+    )
+    verify(True, Pattern(0, 0b11).contains(Pattern(0b01, 0)))
+    verify(False, Pattern(0b01, 0).contains(Pattern(0, 0b11)))
+    # XX minus 01 and 1X leaves 00.
+    verify(1, count_uncovered(Pattern(0, 0b11), [Pattern(0b01, 0), Pattern(0b10, 0b1)]))
+    verify(0, count_uncovered(Pattern(0b1, 0), [Pattern(0, 0b11)]))
+    # X01, 011 and 0X1 cover 001, 101 and 011 between them.
+    verify(
+        5,
+        count_uncovered(
+            Pattern(0, 0b111),
+            [Pattern(0b001, 0b100), Pattern(0b011, 0), Pattern(0b001, 0b010)],
+        ),
+    )
+    memory = SymbolicMemory()
+    for address, value in ((0, 5), (1, 7), (0, 3)):
+        memory.write(address, compile_mask("0" * (MASK_BITS - 1) + "X"), value)
+    verify(
+        [(Pattern(0, 1), 2), (Pattern(0, 1), 0), (Pattern(0, 1), 0)],
+        list(memory.uncovered()),
+    )
+    verify(6, memory.total())
+    for seed, bits in ((2, 3), (3, 6), (4, 9)):
+        program = random_program(200, floating_bits=bits, address_bits=6, seed=seed)
+        verify(initialize_version_two(program), initialize_symbolic(program))
 
     from input_fourteen import input_
 
     print("Part one: ", initialize(input_))
-    print("Part two: ", initialize_version_two(input_))
\ No newline at end of file
+    print("Part two: ", initialize_version_two(input_))
+    verify(initialize(input_), execute(input_))
+    verify(initialize_version_two(input_), initialize_symbolic(input_))
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        benchmark_floating()
+        benchmark_symbolic()
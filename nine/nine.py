@@ -50,8 +50,23 @@ In this example, after the 5-number preamble, almost every number is the sum of
 The first step of attacking the weakness in the XMAS data is to find the first number in the list (after the preamble) which is not the sum of two of the 25 numbers before it. What is the first number that does not have this property?
 """
 
+from array import array
 from collections import deque
-from typing import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from random import Random
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import math
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # NumPy is optional; the array module is used without it.
+    np = None
 
 
 def locate_invalid(sequence: list[int], preamble_length: int) -> int:
@@ -65,36 +80,405 @@ def locate_invalid(sequence: list[int], preamble_length: int) -> int:
 
 def contains_addends_of(options: Sequence[int], candidate: int) -> bool:
     """
-    Return True if at least one pair of numbers in options sums to candidate
+    Return True if at least one pair of different numbers in options sums to candidate
     """
     compliments = {candidate - option for option in options}
     for option in options:
-        if option in compliments:
+        if option in compliments and option != candidate - option:
             return True
     return False
 
 
+class XmasValidator:
+    """
+    Validate a stream of XMAS numbers one at a time.
+
+    The window of preceding numbers is kept as a deque alongside a count of
+    each value in it, so sliding the window is O(1) and checking a candidate
+    is a single pass over the distinct values without building a new set.
+    """
+
+    def __init__(self, preamble_length: int):
+        self.preamble_length = preamble_length
+        self.window: deque[int] = deque()
+        self.counts: dict[int, int] = {}
+
+    def is_valid(self, candidate: int) -> bool:
+        """
+        Return True if two different values in the window sum to candidate.
+        """
+        counts = self.counts
+        for option in counts:
+            compliment = candidate - option
+            if compliment != option and compliment in counts:
+                return True
+        return False
+
+    def push(self, number: int) -> bool:
+        """
+        Add number to the window and return False if it is invalid.
+
+        Numbers in the preamble are always valid.
+        """
+        window = self.window
+        counts = self.counts
+        valid = len(window) < self.preamble_length or self.is_valid(number)
+        window.append(number)
+        counts[number] = counts.get(number, 0) + 1
+        if len(window) > self.preamble_length:
+            oldest = window.popleft()
+            remaining = counts[oldest] - 1
+            if remaining:
+                counts[oldest] = remaining
+            else:
+                del counts[oldest]
+        return valid
+
+
+def find_invalid(
+    stream: Iterable[int], preamble_length: int
+) -> Iterator[tuple[int, int]]:
+    """
+    Yield the position and value of every invalid number in the stream.
+    """
+    validator = XmasValidator(preamble_length)
+    for position, number in enumerate(stream):
+        if not validator.push(number):
+            yield position, number
+
+
 def find_weakness(sequence: list[int], preamble_length: int) -> int:
     """
     Return the sum of the min and max values in a contiguous range of the sequence that add to an invalid number.
     """
     invalid = locate_invalid(sequence, preamble_length)
     # Find a contiguous sequence of at least two numbers that sum to the invalid number
-    range_ = find_addends(sequence, invalid)
-    return min(range_) + max(range_)
+    range_ = find_range(sequence, invalid)
+    if range_ is None:
+        raise ValueError(f"No contiguous range sums to {invalid}.")
+    low, high = next(range_extremes(sequence, [range_]))
+    return low + high
 
 
 def find_addends(items: Sequence[int], target: int) -> Sequence[int]:
-    len_ = len(items)
-    for i in range(len_):
-        sum_ = items[i]
-        for j in range(i + 1, len_):
-            sum_ += items[j]
-            if sum_ == target:
-                return items[i : j + 1]
-            if sum_ > target:
-                break
-    return []
+    found = find_range(items, target)
+    if found is None:
+        return []
+    start, stop = found
+    return items[start:stop]
+
+
+def find_range(
+    items: Sequence[int], target: int, min_length: int = 2
+) -> Optional[tuple[int, int]]:
+    """
+    Return the (start, stop) slice bounds of the first contiguous range that sums to target.
+
+    "First" means the range that ends first. Ranges shorter than min_length are
+    ignored. Non-negative items are searched with a two-pointer window; any
+    negative item falls back to the prefix sums used by find_ranges.
+    """
+    if any(item < 0 for item in items):
+        return next(find_ranges(items, target, min_length), None)
+    start = 0
+    sum_ = 0
+    for stop, item in enumerate(items, start=1):
+        sum_ += item
+        while sum_ > target and stop - start > 1:
+            sum_ -= items[start]
+            start += 1
+        if sum_ == target and stop - start >= min_length:
+            return start, stop
+    return None
+
+
+def find_ranges(
+    items: Sequence[int], target: int, min_length: int = 2
+) -> Iterator[tuple[int, int]]:
+    """
+    Yield the (start, stop) slice bounds of every contiguous range that sums to target.
+
+    Ranges are ordered by stop, then start. A range [start, stop) sums to target
+    when prefix[stop] - prefix[start] == target, so each stop looks up the
+    starts recorded for prefix[stop] - target. Starts are only recorded once
+    they are at least min_length behind the current stop.
+    """
+    prefixes = [0]
+    for item in items:
+        prefixes.append(prefixes[-1] + item)
+    starts: dict[int, list[int]] = {}
+    for stop in range(min_length, len(prefixes)):
+        start = stop - min_length
+        starts.setdefault(prefixes[start], []).append(start)
+        for start in starts.get(prefixes[stop] - target, ()):
+            yield start, stop
+
+
+def range_extremes(
+    items: Sequence[int], ranges: Iterable[tuple[int, int]]
+) -> Iterator[tuple[int, int]]:
+    """
+    Yield the (min, max) of each (start, stop) range.
+
+    Monotonic deques of indexes slide along with the ranges, so ranges whose
+    start and stop never decrease, like those found in non-negative items,
+    cost O(len(items)) in total. A range that starts before the previous one
+    rebuilds the deques.
+    """
+    lows: deque[int] = deque()
+    highs: deque[int] = deque()
+    previous_start = 0
+    loaded = 0
+    for start, stop in ranges:
+        if start < previous_start or stop < loaded:
+            lows.clear()
+            highs.clear()
+            loaded = start
+        previous_start = start
+        loaded = max(loaded, start)
+        while loaded < stop:
+            item = items[loaded]
+            while lows and items[lows[-1]] >= item:
+                lows.pop()
+            lows.append(loaded)
+            while highs and items[highs[-1]] <= item:
+                highs.pop()
+            highs.append(loaded)
+            loaded += 1
+        while lows[0] < start:
+            lows.popleft()
+        while highs[0] < start:
+            highs.popleft()
+        yield items[lows[0]], items[highs[0]]
+
+
+def as_int64(sequence: Iterable[int]) -> Any:
+    """
+    Return the sequence as a NumPy int64 array, or as an array('q') without NumPy.
+
+    Either stores 8 bytes per value instead of a list's pointer plus int object.
+    """
+    if np is not None:
+        if isinstance(sequence, Iterator):
+            return np.fromiter(sequence, dtype=np.int64)
+        return np.ascontiguousarray(sequence, dtype=np.int64)
+    return array("q", sequence)
+
+
+def find_range_vectorized(
+    items: Sequence[int], target: int, min_length: int = 2
+) -> Optional[tuple[int, int]]:
+    """
+    Return the same range as find_range using NumPy prefix sums.
+
+    Prefix sums of non-negative items never decrease, so np.searchsorted finds
+    the earliest start for every stop at once. Negative items, or a missing
+    NumPy, fall back to find_range.
+    """
+    if np is None:
+        return find_range(items, target, min_length)
+    items = np.asarray(items, dtype=np.int64)
+    if not len(items) or items.min() < 0:
+        return find_range(items.tolist(), target, min_length)
+    prefixes = np.zeros(len(items) + 1, dtype=np.int64)
+    np.cumsum(items, out=prefixes[1:])
+    wanted = prefixes - target
+    starts = np.searchsorted(prefixes, wanted)
+    found = (prefixes[np.minimum(starts, len(items))] == wanted) & (
+        np.arange(len(prefixes)) - starts >= min_length
+    )
+    stops = np.flatnonzero(found)
+    if not len(stops):
+        return None
+    stop = int(stops[0])
+    return int(starts[stop]), stop
+
+
+def _has_distinct_pair(windows: Any, candidates: Any) -> Any:
+    """
+    Return which candidates are the sum of two different values in their sorted window.
+
+    Runs the two-pointer search over every row at once; each step moves one
+    pointer of every unresolved row, so it takes at most one step per column.
+    """
+    rows = np.arange(len(candidates))
+    low = np.zeros(len(candidates), dtype=np.intp)
+    high = np.full(len(candidates), windows.shape[1] - 1, dtype=np.intp)
+    valid = np.zeros(len(candidates), dtype=bool)
+    for _ in range(windows.shape[1] - 1):
+        lows = windows[rows, low]
+        highs = windows[rows, high]
+        sums = lows + highs
+        active = (low < high) & ~valid
+        valid |= active & (sums == candidates) & (lows != highs)
+        step_low = active & (sums <= candidates)
+        low += step_low
+        high -= active & ~step_low
+    return valid
+
+
+def invalid_positions(
+    items: Sequence[int], preamble_length: int, block_size: Optional[int] = None
+) -> Any:
+    """
+    Return the position of every invalid number, in order.
+
+    With NumPy, candidates are checked in blocks of block_size against sorted
+    copies of their windows. Without it, find_invalid does the work and the
+    positions are returned as an array('q').
+    """
+    if preamble_length < 1:
+        raise ValueError(
+            f"The preamble must hold at least one number: {preamble_length}"
+        )
+    if np is None:
+        return array(
+            "q", (position for (position, _) in find_invalid(items, preamble_length))
+        )
+    items = np.asarray(items, dtype=np.int64)
+    if len(items) <= preamble_length:
+        return np.empty(0, dtype=np.int64)
+    if block_size is None:
+        block_size = max(2**22 // preamble_length, 1)
+    windows = sliding_window_view(items, preamble_length)
+    found = [np.empty(0, dtype=np.int64)]
+    for first in range(preamble_length, len(items), block_size):
+        last = min(first + block_size, len(items))
+        sorted_windows = np.sort(
+            windows[first - preamble_length : last - preamble_length], axis=1
+        )
+        valid = _has_distinct_pair(sorted_windows, items[first:last])
+        found.append(np.flatnonzero(~valid) + first)
+    return np.concatenate(found)
+
+
+def locate_invalid_vectorized(items: Sequence[int], preamble_length: int) -> int:
+    positions = invalid_positions(items, preamble_length)
+    return int(items[positions[0]]) if len(positions) else -1
+
+
+def _invalid_in_chunk(task: tuple[str, int, int, int, int]) -> list[int]:
+    """
+    Return the invalid positions in [first, last) of a sequence held in shared memory.
+    """
+    name, length, preamble_length, first, last = task
+    shared = SharedMemory(name=name)
+    values = shared.buf.cast("q")
+    chunk = values[first - preamble_length : last]
+    try:
+        if np is not None:
+            positions = invalid_positions(
+                np.frombuffer(chunk, dtype=np.int64), preamble_length
+            ).tolist()
+        else:
+            positions = list(invalid_positions(chunk, preamble_length))
+        return [first - preamble_length + position for position in positions]
+    finally:
+        chunk.release()
+        values.release()
+        shared.close()
+
+
+def invalid_positions_parallel(
+    items: Sequence[int],
+    preamble_length: int,
+    processes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> list[int]:
+    """
+    Return the position of every invalid number, in order, checking chunks in a process pool.
+
+    Each candidate only depends on the preamble_length numbers before it, so
+    the sequence is split into chunks that each start with their own preamble.
+    The numbers are copied once into shared memory and workers read their
+    chunk from there instead of receiving it pickled.
+    """
+    if preamble_length < 1:
+        raise ValueError(
+            f"The preamble must hold at least one number: {preamble_length}"
+        )
+    values = as_int64(items)
+    length = len(values)
+    if length <= preamble_length:
+        return []
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = math.ceil((length - preamble_length) / (4 * processes))
+    shared = SharedMemory(create=True, size=length * 8)
+    view = shared.buf.cast("q")
+    try:
+        view[:length] = memoryview(values).cast("B").cast("q")
+        tasks = [
+            (
+                shared.name,
+                length,
+                preamble_length,
+                first,
+                min(first + chunk_size, length),
+            )
+            for first in range(preamble_length, length, chunk_size)
+        ]
+        with ProcessPoolExecutor(processes) as pool:
+            return [
+                position
+                for positions in pool.map(_invalid_in_chunk, tasks)
+                for position in positions
+            ]
+    finally:
+        view.release()
+        shared.close()
+        shared.unlink()
+
+
+def xmas_sequence(
+    length: int, preamble_length: int, invalid_rate: float = 0.01, seed: int = 0
+) -> list[int]:
+    """
+    Return a random XMAS sequence with roughly invalid_rate of its numbers invalid.
+
+    Valid numbers are the sum of two different values in their window.
+    """
+    random = Random(seed)
+    sequence = random.sample(range(1, 10 * preamble_length + 1), preamble_length)
+    while len(sequence) < length:
+        window = sequence[-preamble_length:]
+        if random.random() < invalid_rate:
+            sequence.append(2 * max(window) + 1)
+        else:
+            first, second = random.sample(window, 2)
+            while first == second:
+                first, second = random.sample(window, 2)
+            sequence.append(first + second)
+    return sequence
+
+
+def benchmark(
+    preamble_lengths: Sequence[int] = (25, 1_000, 10_000), candidates: int = 5_000
+) -> None:
+    """
+    Compare finding every invalid number with contains_addends_of and with find_invalid.
+    """
+    for preamble_length in preamble_lengths:
+        sequence = xmas_sequence(preamble_length + candidates, preamble_length)
+
+        start = time.perf_counter()
+        options = deque(sequence[:preamble_length], preamble_length)
+        expected = []
+        for position in range(preamble_length, len(sequence)):
+            candidate = sequence[position]
+            if not contains_addends_of(options, candidate):
+                expected.append((position, candidate))
+            options.append(candidate)
+        rebuilt = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = list(find_invalid(sequence, preamble_length))
+        incremental = time.perf_counter() - start
+
+        assert expected == actual
+        print(f"{candidates:,} candidates, window of {preamble_length:,}")
+        print(f"  contains_addends_of: {rebuilt:.3f}s")
+        print(f"  find_invalid:        {incremental:.3f}s")
 
 
 """
@@ -133,6 +517,55 @@ What is the encryption weakness in your XMAS-encrypted list of numbers?
 """
 
 
+def benchmark_arrays(length: int = 10**8, preamble_length: int = 25) -> None:
+    """
+    Compare the memory and time needed to find every invalid number in a list and in an int64 array.
+
+    Random values are almost all invalid, which is the worst case for both.
+    """
+    random = Random(0)
+    sequence = [random.getrandbits(40) for _ in range(length)]
+    list_bytes = sys.getsizeof(sequence) + sum(map(sys.getsizeof, sequence))
+
+    start = time.perf_counter()
+    expected = [position for (position, _) in find_invalid(sequence, preamble_length)]
+    list_elapsed = time.perf_counter() - start
+
+    items = as_int64(sequence)
+    del sequence
+    array_bytes = len(items) * items.itemsize
+    start = time.perf_counter()
+    actual = invalid_positions(items, preamble_length)
+    array_elapsed = time.perf_counter() - start
+
+    assert expected == list(actual)
+    backend = "NumPy" if np is not None else "array('q')"
+    print(f"{length:,} numbers, window of {preamble_length}, {len(expected):,} invalid")
+    print(f"  list[int]:    {list_bytes / 2**20:,.1f} MiB, {list_elapsed:.3f}s")
+    print(f"  {backend + ':':<13} {array_bytes / 2**20:,.1f} MiB, {array_elapsed:.3f}s")
+
+
+def benchmark_parallel(length: int = 10**7, preamble_length: int = 25) -> None:
+    """
+    Compare invalid_positions in one process against invalid_positions_parallel on every core.
+    """
+    random = Random(0)
+    items = as_int64(random.getrandbits(40) for _ in range(length))
+
+    start = time.perf_counter()
+    expected = list(invalid_positions(items, preamble_length))
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = invalid_positions_parallel(items, preamble_length)
+    parallel = time.perf_counter() - start
+
+    assert expected == actual
+    print(f"{length:,} numbers, window of {preamble_length}")
+    print(f"  One process:               {serial:.3f}s")
+    print(f"  {os.cpu_count()} processes, shared memory: {parallel:.3f}s")
+
+
 if __name__ == "__main__":
     diagnostic = [
         35,
@@ -164,7 +597,78 @@ if __name__ == "__main__":
     actual = find_weakness(diagnostic, 5)
     assert expected == actual
 
+    assert find_range(diagnostic, 127) == (2, 6)
+    assert find_range_vectorized(diagnostic, 127) == (2, 6)
+    assert find_range_vectorized([1, 2, 0, 3], 3) == (0, 2)
+    assert find_range_vectorized([4, -1, 2, 1], 2) == (1, 4)
+    assert find_range_vectorized(diagnostic, 1) is None
+    assert list(invalid_positions(as_int64(diagnostic), 5)) == [14]
+    assert list(invalid_positions([25, 25, 50, 75, 125], 2)) == [2]
+    assert list(invalid_positions([25, 25], 5)) == []
+    assert list(invalid_positions([25, 25, 50], 3)) == []
+    for positions in (invalid_positions, invalid_positions_parallel):
+        try:
+            positions(diagnostic, 0)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{positions.__name__} accepted an empty preamble")
+    assert locate_invalid_vectorized(as_int64(diagnostic), 5) == 127
+    assert invalid_positions_parallel(diagnostic, 5, processes=2, chunk_size=4) == [14]
+    assert invalid_positions_parallel(diagnostic[:5], 5) == []
+    if np is not None:
+        strided = (np.arange(200) ** 2)[::2]
+        assert invalid_positions_parallel(strided, 5, processes=2) == list(
+            invalid_positions(strided.tolist(), 5)
+        )
+    assert list(range_extremes(diagnostic, [(2, 6)])) == [(15, 47)]
+    assert find_range([4, -1, 2, 1], 2) == (1, 4)
+    assert find_range([5], 5) is None
+    assert list(find_ranges([1, 2, 0, 3, -3, 3], 3)) == [
+        (0, 2),
+        (0, 3),
+        (2, 4),
+        (0, 5),
+        (2, 6),
+        (3, 6),
+    ]
+    assert list(
+        range_extremes([3, 1, 4, 1, 5, 9], [(0, 2), (1, 4), (2, 6), (0, 6)])
+    ) == [
+        (1, 3),
+        (1, 4),
+        (1, 9),
+        (1, 9),
+    ]
+
+    assert list(find_invalid(diagnostic, 5)) == [(14, 127)]
+    # 6 is only 3 + 3, and the puzzle requires two different numbers.
+    assert not contains_addends_of([1, 2, 3], 6)
+    assert locate_invalid([1, 2, 3, 6, 50], 3) == 6
+    assert next(find_invalid([1, 2, 3, 6, 50], 3)) == (3, 6)
+    validator = XmasValidator(2)
+    assert [validator.push(number) for number in (25, 25, 50, 75, 125)] == [
+        True,
+        True,
+        False,
+        True,
+        True,
+    ]
+
     from input_nine import input_
 
     print("Part one: ", locate_invalid(input_, 25))
-    print("Part two: ", find_weakness(input_, 25))
\ No newline at end of file
+    print("Part two: ", find_weakness(input_, 25))
+    assert next(find_invalid(input_, 25))[1] == locate_invalid(input_, 25)
+    assert list(invalid_positions(as_int64(input_), 25)) == [
+        position for (position, _) in find_invalid(input_, 25)
+    ]
+    assert find_range_vectorized(input_, 88311122) == find_range(input_, 88311122)
+    assert invalid_positions_parallel(input_, 25, processes=2, chunk_size=100) == list(
+        invalid_positions(input_, 25)
+    )
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        benchmark_arrays()
+        benchmark_parallel()
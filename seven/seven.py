@@ -33,17 +33,21 @@ So, in this example, the number of bag colors that can eventually contain at lea
 How many bag colors can eventually contain at least one shiny gold bag? (The list of rules is quite long; make sure you get all of it.)
 """
 
-from typing import Sequence
+from random import Random
+from typing import Any, Callable, Sequence
+
+import sys
+import time
 
 
 def make_graph(rules: Sequence[str]) -> dict[str, dict[str, int]]:
-    rv = {}
-    for rule in rules:
-        origin, destinations = rule.split(" contain ")
-        origin, *_ = origin.split(" bags")
-        destinations = parse_destinations(destinations)
-        rv[origin] = dict(destinations)
-    return rv
+    return dict(parse_rule(rule) for rule in rules)
+
+
+def parse_rule(rule: str) -> tuple[str, dict[str, int]]:
+    origin, destinations = rule.split(" contain ")
+    origin, *_ = origin.split(" bags")
+    return origin, dict(parse_destinations(destinations))
 
 
 def parse_destinations(destinations: str) -> Sequence[tuple[str, int]]:
@@ -121,6 +125,174 @@ def part_two(rules: Sequence[str], container: str = "shiny gold") -> int:
     return count_contents(container, graph) - 1  # subtract the outermost bag
 
 
+def format_rule(origin: str, contents: dict[str, int]) -> str:
+    if not contents:
+        return f"{origin} bags contain no other bags."
+    destinations = ", ".join(
+        f"{count} {color} {'bag' if count == 1 else 'bags'}"
+        for (color, count) in contents.items()
+    )
+    return f"{origin} bags contain {destinations}."
+
+
+class BagRuleBook:
+    """
+    A set of bag rules that can change one rule at a time.
+
+    Containment and count queries are memoized per container. Changing the rule
+    for a color only discards the memoized answers for that color and the
+    colors that can contain it; everything else is reused by later queries.
+    """
+
+    def __init__(self, rules: Sequence[str] = ()):
+        self.contents: dict[str, dict[str, int]] = {}
+        self.containers: dict[str, set[str]] = {}
+        self._descendants: dict[str, frozenset[str]] = {}
+        self._counts: dict[str, int] = {}
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: str) -> None:
+        origin, contents = parse_rule(rule)
+        if origin in self.contents:
+            raise ValueError(f"A rule for {origin} bags already exists.")
+        self._link(origin, contents)
+
+    def replace(self, rule: str) -> None:
+        origin, contents = parse_rule(rule)
+        self.remove(origin)
+        self._link(origin, contents)
+
+    def remove(self, origin: str) -> None:
+        if origin not in self.contents:
+            raise ValueError(f"There is no rule for {origin} bags.")
+        self._invalidate(origin)
+        for child in self.contents.pop(origin):
+            self.containers[child].discard(origin)
+
+    def _link(self, origin: str, contents: dict[str, int]) -> None:
+        self._invalidate(origin)
+        self.contents[origin] = contents
+        for child in contents:
+            self.containers.setdefault(child, set()).add(origin)
+
+    def _invalidate(self, color: str) -> None:
+        # A memoized answer for a color is only computed after the answers for
+        # all of its contents, so a color missing from a cache has no
+        # containers in that cache either and the walk can stop there.
+        for cache in (self._descendants, self._counts):
+            stale = [color]
+            while stale:
+                node = stale.pop()
+                if cache.pop(node, None) is None:
+                    continue
+                stale.extend(self.containers.get(node, ()))
+
+    def _resolve(
+        self,
+        color: str,
+        cache: dict[str, Any],
+        combine: Callable[[dict[str, int]], Any],
+    ) -> Any:
+        """
+        Return the memoized value for color, computing any missing values for its contents first.
+        """
+        stack = [color]
+        while stack:
+            node = stack[-1]
+            if node in cache:
+                stack.pop()
+                continue
+            children = self.contents.get(node, {})
+            pending = [child for child in children if child not in cache]
+            if pending:
+                stack.extend(pending)
+                continue
+            cache[node] = combine(children)
+            stack.pop()
+        return cache[color]
+
+    def descendants(self, container: str) -> frozenset[str]:
+        """
+        Return every color that can eventually be inside the container.
+        """
+
+        def combine(children: dict[str, int]) -> frozenset[str]:
+            rv = set(children)
+            for child in children:
+                rv |= self._descendants[child]
+            return frozenset(rv)
+
+        return self._resolve(container, self._descendants, combine)
+
+    def can_contain(self, container: str, containee: str) -> bool:
+        return containee in self.descendants(container)
+
+    def count_containers(self, containee: str = "shiny gold") -> int:
+        return sum(self.can_contain(origin, containee) for origin in self.contents)
+
+    def count_contents(self, container: str = "shiny gold") -> int:
+        def combine(children: dict[str, int]) -> int:
+            return 1 + sum(
+                self._counts[child] * count for (child, count) in children.items()
+            )
+
+        return self._resolve(container, self._counts, combine) - 1
+
+    def rules(self) -> list[str]:
+        return [
+            format_rule(origin, contents)
+            for (origin, contents) in self.contents.items()
+        ]
+
+
+def benchmark(
+    edits: int = 10_000, colors: int = 100, depth: int = 5, seed: int = 0
+) -> None:
+    """
+    Compare answering both parts after every edit with a BagRuleBook against rebuilding the graph.
+    """
+    random = Random(seed)
+    names = [f"tone{idx} blue" for idx in range(colors)]
+    width = colors // depth
+    target = names[width * (depth // 2)]
+
+    def random_rule(idx: int) -> str:
+        # Bags only contain bags from the next layer, which keeps the rules acyclic
+        # and about as deep as the puzzle input.
+        layer = idx // width + 1
+        below = names[layer * width : (layer + 1) * width]
+        children = random.sample(below, min(len(below), random.randint(0, 3)))
+        return format_rule(
+            names[idx], {child: random.randint(1, 4) for child in children}
+        )
+
+    initial = [random_rule(idx) for idx in range(colors)]
+    changes = [random_rule(random.randrange(colors)) for _ in range(edits)]
+
+    start = time.perf_counter()
+    book = BagRuleBook(initial)
+    incremental = []
+    for rule in changes:
+        book.replace(rule)
+        incremental.append((book.count_containers(target), book.count_contents(target)))
+    incremental_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rules = {parse_rule(rule)[0]: rule for rule in initial}
+    rebuilt = []
+    for rule in changes:
+        rules[parse_rule(rule)[0]] = rule
+        current = list(rules.values())
+        rebuilt.append((part_one(current, target), part_two(current, target)))
+    rebuild_elapsed = time.perf_counter() - start
+
+    assert incremental == rebuilt
+    print(f"{edits:,} edits over {colors:,} rules")
+    print(f"  BagRuleBook:  {incremental_elapsed:.3f}s")
+    print(f"  Full rebuild: {rebuild_elapsed:.3f}s")
+
+
 if __name__ == "__main__":
     diagnostic = [
         "light red bags contain 1 bright white bag, 2 muted yellow bags.",
@@ -147,7 +319,40 @@ if __name__ == "__main__":
         "dark violet bags contain no other bags.",
     ]
     assert part_two(level_three_diagnostic, shiny_gold) == 126
+
+    book = BagRuleBook(diagnostic)
+    assert book.count_containers(shiny_gold) == 4
+    assert book.count_contents(shiny_gold) == 32
+    assert parse_rule(
+        format_rule("shiny gold", {"dark olive": 1, "vibrant plum": 2})
+    ) == (
+        "shiny gold",
+        {"dark olive": 1, "vibrant plum": 2},
+    )
+    book.replace("bright white bags contain 1 faded blue bag.")
+    assert book.count_containers(shiny_gold) == 3
+    book.replace("shiny gold bags contain 1 dark olive bag.")
+    assert book.count_contents(shiny_gold) == 8
+    book.remove("dark olive")
+    assert book.count_contents(shiny_gold) == 1
+    book.add("dark olive bags contain 2 dotted black bags.")
+    assert book.count_contents(shiny_gold) == 3
+    assert book.count_containers(shiny_gold) == part_one(book.rules(), shiny_gold)
+    for edit, argument in (
+        (book.replace, "mauve bags contain 1 shiny gold bag."),
+        (book.remove, "mauve"),
+    ):
+        try:
+            edit(argument)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{edit.__name__} accepted a color without a rule")
+    assert "mauve" not in book.contents
     from seven_input import input_
 
     print("Part one: ", part_one(input_, shiny_gold))
-    print("Part two: ", part_two(input_, shiny_gold))
\ No newline at end of file
+    print("Part two: ", part_two(input_, shiny_gold))
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
@@ -85,8 +85,20 @@ In this larger example, in a chain that uses all of the adapters, there are 22 d
 Find a chain that uses all of your adapters to connect the charging outlet to your device's built-in adapter and count the joltage differences between the charging outlet, the adapters, and your device. What is the number of 1-jolt differences multiplied by the number of 3-jolt differences?
 """
 
-
-from typing import Any, MutableSequence, Optional, Sequence
+from random import Random
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+import math
+import sys
+import time
 
 
 def part_one(adapters: Sequence[int]) -> int:
@@ -208,6 +220,310 @@ def part_two(adapters: Sequence[int]) -> int:
     return combinations[-1]
 
 
+class ChainSummary(NamedTuple):
+    differences: dict[int, int]
+    arrangements: int
+
+
+class AdapterChain:
+    """
+    Adapters between a wall outlet and a device, preprocessed once for both parts.
+
+    present is a bitmap over joltage values that marks the outlet (0), every
+    adapter, and the device (max_gap above the largest adapter), so neither
+    part needs to sort the adapters.
+    """
+
+    def __init__(self, adapters: Iterable[int], max_gap: int = 3):
+        adapters = list(adapters)
+        self.max_gap = max_gap
+        self.device = max(adapters, default=0) + max_gap
+        self.present = bytearray(self.device + 1)
+        self.present[0] = 1
+        self.present[self.device] = 1
+        for adapter in adapters:
+            self.present[adapter] = 1
+        self._paths_to_device: Optional[list[int]] = None
+
+    def summarize(self) -> ChainSummary:
+        """
+        Return the joltage difference histogram and the number of arrangements in one pass.
+
+        ways[joltage] is the number of arrangements that end at joltage, which is
+        the sum of the ways for the max_gap joltages below it. Only those
+        max_gap values are kept, in a ring indexed by joltage % max_gap,
+        alongside their running total.
+        """
+        present = self.present
+        max_gap = self.max_gap
+        differences: dict[int, int] = {}
+        ways = [0] * max_gap
+        ways[0] = 1
+        total = 1
+        previous = 0
+        for joltage in range(1, self.device + 1):
+            slot = joltage % max_gap
+            if present[joltage]:
+                difference = joltage - previous
+                differences[difference] = differences.get(difference, 0) + 1
+                previous = joltage
+                current = total
+            else:
+                current = 0
+            total += current - ways[slot]
+            ways[slot] = current
+        return ChainSummary(differences, ways[self.device % max_gap])
+
+    def arrangements_modulo(self, modulus: int) -> int:
+        """
+        Return the number of arrangements modulo modulus, keeping every DP value small.
+        """
+        present = self.present
+        max_gap = self.max_gap
+        ways = [0] * max_gap
+        ways[0] = 1 % modulus
+        total = ways[0]
+        for joltage in range(1, self.device + 1):
+            slot = joltage % max_gap
+            current = total if present[joltage] else 0
+            total = (total + current - ways[slot]) % modulus
+            ways[slot] = current
+        return ways[self.device % max_gap]
+
+    def log_arrangements(self) -> float:
+        """
+        Return the natural log of the number of arrangements, or -inf if there are none.
+
+        The DP runs on floats. Whenever they grow past LOG_RESCALE_AT, they are
+        divided down and the log of the divisor is added to an offset.
+        """
+        present = self.present
+        max_gap = self.max_gap
+        ways = [0.0] * max_gap
+        ways[0] = 1.0
+        offset = 0.0
+        for joltage in range(1, self.device + 1):
+            slot = joltage % max_gap
+            current = sum(ways) if present[joltage] else 0.0
+            ways[slot] = current
+            if current > LOG_RESCALE_AT:
+                ways = [way / current for way in ways]
+                offset += math.log(current)
+        final = ways[self.device % max_gap]
+        return offset + math.log(final) if final else -math.inf
+
+    def segment_arrangements(self) -> list[int]:
+        """
+        Return the number of arrangements of each segment of the chain.
+
+        Neither end of a gap of exactly max_gap between consecutive joltages
+        can be skipped, so every arrangement passes through both and the chain
+        splits there into segments whose counts multiply.
+        """
+        present = self.present
+        max_gap = self.max_gap
+        segments = []
+        ways = [0] * max_gap
+        ways[0] = 1
+        total = 1
+        previous = 0
+        for joltage in range(1, self.device + 1):
+            slot = joltage % max_gap
+            if not present[joltage]:
+                total -= ways[slot]
+                ways[slot] = 0
+                continue
+            if joltage - previous == max_gap:
+                segments.append(total)
+                ways = [0] * max_gap
+                total = 0
+                current = 1
+            else:
+                current = total
+            total += current - ways[slot]
+            ways[slot] = current
+            previous = joltage
+        segments.append(ways[self.device % max_gap])
+        return segments
+
+    def arrangements_by_segments(self) -> int:
+        """
+        Return the exact number of arrangements as a balanced product of the segment counts.
+        """
+        return product_tree(self.segment_arrangements())
+
+    def paths_to_device(self) -> list[int]:
+        """
+        Return, for every joltage, the number of ways to continue from it to the device.
+
+        Absent joltages have no ways. The table is computed once and reused by
+        the enumeration, sampling, and ranking methods.
+        """
+        if self._paths_to_device is None:
+            present = self.present
+            max_gap = self.max_gap
+            after = [0] * (self.device + max_gap + 1)
+            after[self.device] = 1
+            total = 1
+            for joltage in range(self.device - 1, -1, -1):
+                if present[joltage]:
+                    after[joltage] = total
+                total += after[joltage] - after[joltage + max_gap]
+            del after[self.device + 1 :]
+            self._paths_to_device = after
+        return self._paths_to_device
+
+    def _next_steps(self, joltage: int, after: Optional[int] = None) -> Iterator[int]:
+        """
+        Yield the joltages above joltage, or above after, that can follow it on the way to the device.
+        """
+        paths = self.paths_to_device()
+        first = joltage + 1 if after is None else after + 1
+        for step in range(first, min(joltage + self.max_gap, self.device) + 1):
+            if paths[step]:
+                yield step
+
+    def _extend(self, path: list[int]) -> None:
+        while path[-1] != self.device:
+            path.append(next(self._next_steps(path[-1])))
+
+    def unrank(self, index: int) -> tuple[int, ...]:
+        """
+        Return the adapters of the arrangement at index in lexicographic order.
+        """
+        paths = self.paths_to_device()
+        if not 0 <= index < paths[0]:
+            raise IndexError(f"There is no arrangement {index}.")
+        joltage = 0
+        used = []
+        while joltage != self.device:
+            for step in self._next_steps(joltage):
+                if index < paths[step]:
+                    joltage = step
+                    break
+                index -= paths[step]
+            used.append(joltage)
+        return tuple(used[:-1])
+
+    def rank(self, arrangement: Sequence[int]) -> int:
+        """
+        Return the lexicographic index of an arrangement of adapters.
+        """
+        paths = self.paths_to_device()
+        index = 0
+        joltage = 0
+        for chosen in (*arrangement, self.device):
+            for step in self._next_steps(joltage):
+                if step == chosen:
+                    break
+                index += paths[step]
+            else:
+                raise ValueError(f"{tuple(arrangement)} is not a valid arrangement.")
+            joltage = chosen
+        return index
+
+    def sample_arrangement(self, random: Optional[Random] = None) -> tuple[int, ...]:
+        """
+        Return an arrangement chosen uniformly at random.
+        """
+        count = self.paths_to_device()[0]
+        if count == 0:
+            raise IndexError("There are no arrangements to sample from.")
+        random = random or Random()
+        return self.unrank(random.randrange(count))
+
+    def enumerate_arrangements(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[tuple[int, ...]]:
+        """
+        Lazily yield the arrangements from index start up to index stop in lexicographic order.
+
+        Only the current arrangement is kept. The next one replaces the deepest
+        adapter that has a larger valid alternative and then takes the smallest
+        valid adapter at every later step, so disjoint index ranges can be
+        handed to different workers.
+        """
+        count = self.paths_to_device()[0]
+        stop = count if stop is None else min(stop, count)
+        if start >= stop:
+            return
+        path = [0, *self.unrank(start), self.device]
+        for _ in range(start, stop):
+            yield tuple(path[1:-1])
+            for depth in range(len(path) - 1, 0, -1):
+                alternative = next(self._next_steps(path[depth - 1], path[depth]), None)
+                if alternative is not None:
+                    del path[depth:]
+                    path.append(alternative)
+                    self._extend(path)
+                    break
+
+
+LOG_RESCALE_AT = 1e200
+
+
+def product_tree(factors: Sequence[int]) -> int:
+    """
+    Return the product of factors, multiplying pairs of similar size at each level.
+
+    Multiplying a huge running product by each small factor in turn re-reads
+    every digit of the product each time; pairing keeps both operands balanced.
+    """
+    factors = list(factors)
+    if not factors:
+        return 1
+    while len(factors) > 1:
+        paired = [
+            factors[idx] * factors[idx + 1] for idx in range(0, len(factors) - 1, 2)
+        ]
+        if len(factors) % 2:
+            paired.append(factors[-1])
+        factors = paired
+    return factors[0]
+
+
+def random_chain(length: int, seed: int = 0) -> list[int]:
+    """
+    Return length adapters joined by random 1, 2 and 3 jolt gaps.
+    """
+    random = Random(seed)
+    adapters = []
+    joltage = 0
+    for _ in range(length):
+        joltage += random.choice((1, 1, 1, 2, 3))
+        adapters.append(joltage)
+    return adapters
+
+
+def benchmark(length: int = 1_000_000) -> None:
+    """
+    Time each way of counting the arrangements of a random chain of length adapters.
+    """
+    chain = AdapterChain(random_chain(length))
+    modulus = 1_000_000_007
+
+    start = time.perf_counter()
+    exact = chain.summarize().arrangements
+    print(f"{length:,} adapters")
+    print(f"  Exact DP:            {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    by_segments = chain.arrangements_by_segments()
+    print(f"  Exact, segmented:    {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    modular = chain.arrangements_modulo(modulus)
+    print(f"  Modular:             {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    log_count = chain.log_arrangements()
+    print(f"  Log count:           {time.perf_counter() - start:.3f}s")
+
+    assert exact == by_segments
+    assert exact % modulus == modular
+    assert math.isclose(log_count, math.log(exact))
+
+
 if __name__ == "__main__":
 
     def verify(expected: Any, actual: Any) -> None:
@@ -265,7 +581,55 @@ if __name__ == "__main__":
     verify(220, part_one(diagnostic))
     verify(19208, part_two(diagnostic))
 
+    summary = AdapterChain(diagnostic).summarize()
+    verify({1: 22, 3: 10}, summary.differences)
+    verify(19208, summary.arrangements)
+    summary = AdapterChain(mini_diagnostic).summarize()
+    verify(7 * 5, summary.differences[1] * summary.differences[3])
+    verify(8, summary.arrangements)
+    verify(ChainSummary({2: 1, 3: 1}, 1), AdapterChain([2]).summarize())
+    verify(
+        ChainSummary({1: 3, 4: 1}, 4), AdapterChain([1, 2, 3], max_gap=4).summarize()
+    )
+    verify(0, AdapterChain([1, 5]).summarize().arrangements)
+
+    chain = AdapterChain(diagnostic)
+    verify(19208 % 1_000, chain.arrangements_modulo(1_000))
+    verify(True, math.isclose(math.log(19208), chain.log_arrangements()))
+    verify([7, 7, 1, 4, 2, 1, 7, 1, 1, 7, 1], chain.segment_arrangements())
+    verify(19208, chain.arrangements_by_segments())
+    verify(-math.inf, AdapterChain([1, 5]).log_arrangements())
+    verify(0, AdapterChain([1, 5]).arrangements_by_segments())
+    verify(24, product_tree([1, 2, 3, 4]))
+
+    chain = AdapterChain(mini_diagnostic)
+    arrangements = list(chain.enumerate_arrangements())
+    verify(8, len(arrangements))
+    verify(sorted(arrangements), arrangements)
+    verify((1, 4, 5, 6, 7, 10, 11, 12, 15, 16, 19), arrangements[0])
+    verify((1, 4, 7, 10, 12, 15, 16, 19), arrangements[-1])
+    verify(arrangements, [chain.unrank(index) for index in range(8)])
+    verify(list(range(8)), [chain.rank(arrangement) for arrangement in arrangements])
+    verify(arrangements[3:5], list(chain.enumerate_arrangements(3, 5)))
+    verify([], list(chain.enumerate_arrangements(8)))
+    verify(True, chain.sample_arrangement(Random(0)) in arrangements)
+    verify(4, len(list(AdapterChain([1, 2, 3], max_gap=4).enumerate_arrangements())))
+    verify([], list(AdapterChain([1, 5]).enumerate_arrangements()))
+    try:
+        AdapterChain([1, 5]).sample_arrangement(Random(0))
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("Sampled an arrangement from a chain without any")
+
     from input_ten import input_
 
     print("Part one: ", part_one(input_))
     print("Part two: ", part_two(input_))
+    summary = AdapterChain(input_).summarize()
+    verify(part_one(input_), summary.differences[1] * summary.differences[3])
+    verify(part_two(input_), summary.arrangements)
+    verify(summary.arrangements, AdapterChain(input_).arrangements_by_segments())
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
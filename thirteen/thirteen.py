@@ -48,8 +48,17 @@ The earliest bus you could take is bus ID 59. It doesn't depart until timestamp
 What is the ID of the earliest bus you can take to the airport multiplied by the number of minutes you'll need to wait for that bus?
 """
 
-from typing import Any
+from functools import reduce
+from random import Random
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
 import math
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch queries fall back to Python ints.
+    np = None
 
 
 def pick_bus(now: str, bus_ids: str) -> int:
@@ -58,12 +67,11 @@ def pick_bus(now: str, bus_ids: str) -> int:
     """
     min_departure = int(now)
     busses = (int(bus_id) for bus_id in bus_ids.split(",") if bus_id != "x")
-    return min(busses, key=lambda bus: math.ceil(min_departure / bus) * bus)
+    return min(busses, key=lambda bus: min_departure + -min_departure % bus)
 
 
 def calculate_wait(now: str, bus: int) -> int:
-    min_departure = int(now)
-    return (math.ceil(min_departure / bus) * bus) - min_departure
+    return -int(now) % bus
 
 
 def part_one(now: str, busses: str) -> int:
@@ -141,53 +149,248 @@ What is the earliest timestamp such that all of the listed bus IDs depart at off
 """
 
 
-def part_two(busses: str) -> int:
+class Lattice(NamedTuple):
+    """
+    The timestamps timestamp + k * period, for k >= 0, are exactly the solutions from timestamp on.
+    """
+
+    timestamp: int
+    period: int
+
+
+def parse_constraints(busses: str) -> list[tuple[int, int]]:
+    """
+    Return (bus, offset) for every bus in service, where offset is its position in the list.
+    """
+    constraints = []
+    for offset, bus in enumerate(busses.split(",")):
+        if bus == "x":
+            continue
+        if int(bus) < 1:
+            raise ValueError(f"Invalid bus id: {bus}")
+        constraints.append((int(bus), offset))
+    return constraints
+
+
+def combine(first: tuple[int, int], second: tuple[int, int]) -> tuple[int, int]:
+    """
+    Return the (remainder, modulus) congruence satisfied by exactly the solutions of two others.
+
+    This is the generalized Chinese remainder theorem, so the moduli do not
+    need to be coprime: t = a (mod m) and t = b (mod n) have solutions if and
+    only if gcd(m, n) divides b - a, and they repeat every lcm(m, n).
+    """
+    remainder, modulus = first
+    other_remainder, other_modulus = second
+    divisor = math.gcd(modulus, other_modulus)
+    difference = other_remainder - remainder
+    if difference % divisor:
+        raise ValueError(
+            f"t = {remainder} (mod {modulus}) and t = {other_remainder} (mod {other_modulus})"
+            " have no common solution."
+        )
+    step = other_modulus // divisor
+    multiple = difference // divisor * pow(modulus // divisor, -1, step) % step
+    combined = modulus * step
+    return (remainder + modulus * multiple) % combined, combined
+
+
+def solve_congruences(congruences: Iterable[tuple[int, int]]) -> tuple[int, int]:
+    """
+    Return the (remainder, modulus) that solves every (remainder, modulus) congruence.
+
+    Each combination costs one extended gcd, so k congruences whose moduli
+    multiply to M take O(k log M) arithmetic operations.
+    """
+    return reduce(combine, congruences, (0, 1))
+
+
+def sieve(congruences: Iterable[tuple[int, int]]) -> tuple[int, int]:
+    """
+    Solve congruences with pairwise coprime moduli by sieving.
+
+    The solution so far is stepped by the product of the moduli so far until
+    it also satisfies the next congruence. This takes O(m) steps per modulus
+    m, but needs nothing beyond addition and remainders.
+    """
+    remainder, modulus = 0, 1
+    for other_remainder, other_modulus in congruences:
+        if math.gcd(modulus, other_modulus) != 1:
+            raise ValueError(f"{other_modulus} is not coprime with {modulus}.")
+        while remainder % other_modulus != other_remainder % other_modulus:
+            remainder += modulus
+        modulus *= other_modulus
+    return remainder, modulus
+
+
+def bus_lattice(busses: str, lower_bound: int = 0) -> Lattice:
+    """
+    Return every timestamp from lower_bound on at which the busses depart consecutively as listed.
+
+    Raises ValueError if no timestamp works, which can only happen when bus
+    ids share a factor.
+    """
+    remainder, period = solve_congruences(
+        (-offset % bus, bus) for (bus, offset) in parse_constraints(busses)
+    )
+    return Lattice(lower_bound + (remainder - lower_bound) % period, period)
+
+
+def part_two(busses: str, lower_bound: int = 0) -> int:
     """
     Return the earliest timestamp at which the busses depart consecutively as listed.
 
     Each comma separated value represents a minute starting at t + 0. If the value
     is a number, then it is the id of a bus that must depart at that time.
     An x in the busses sequence means that any bus may depart at that minute.
+    Bus b departing at t + offset means t = -offset (mod b), so the answer is
+    the Chinese remainder theorem solution of those congruences.
     """
-    parsed_busses = {
-        int(bus): int(offset)
-        for (offset, bus) in enumerate(busses.split(","))
-        if bus != "x"
-    }
-    # The brute force approach is to start from t = 0 and see if each bus can depart at a given time
-    # It works, but it's way too slow, so we need to be smarter.
-    # now = 0
-    # while not all(
-    #     can_depart(now + offset, bus) for (bus, offset) in parsed_busses.items()
-    # ):
-    #     now += 1
-    # return now
-    # A way to be slightly smarter is to identify the largest bus id in the list and check multiples of that value
-    # This may still be slow, but it should be much, much faster than iterating over every value.
-    max_bus = max(parsed_busses)
-    max_offset = parsed_busses[max_bus]
-    now = 100_000_000_000_000 + (max_bus - max_offset)
-    while not all(
-        can_depart(now + offset, bus) for (bus, offset) in parsed_busses.items()
-    ):
-        now += max_bus
+    return bus_lattice(busses, lower_bound).timestamp
 
-    # That's still too slow. What else can we take advantage of?
-    # Are least common multiples beneficial?
-    # We're trying to solve a set of linear equations
-    # 0 = t % (bus_id) + offset
 
-    #
+class Departure(NamedTuple):
+    bus: int
+    timestamp: int
 
-    # for "7,13,x,x,59,x,31,19"
 
-    return now
+INT64_MAX = 2**63 - 1
 
 
-def can_depart(now: int, bus: int) -> bool:
-    if now < bus:
-        return False
-    return (now % bus) == 0
+def _as_batch(values: list[int]) -> Any:
+    """
+    Return exact results as a NumPy object array when NumPy is installed, so batch queries have one return type.
+    """
+    return values if np is None else np.array(values, dtype=object)
+
+
+class Schedule:
+    """
+    A parsed bus schedule that answers departure and alignment queries with exact integers.
+
+    The next departure of bus b at or after t is t + (-t % b), so no query
+    goes through floats and timestamps beyond 2 ** 53 stay exact. When NumPy
+    is installed, batch queries always return NumPy arrays: int64 when every
+    result fits, and an object array of Python ints otherwise. Without NumPy
+    they return lists of ints. The part two congruences are solved once, on
+    the first alignment query.
+    """
+
+    def __init__(self, busses: str):
+        self.constraints = parse_constraints(busses)
+        self.busses = [bus for (bus, _) in self.constraints]
+        if not self.busses:
+            raise ValueError(f"No busses in service: {busses}")
+        self._lattice: Optional[tuple[int, int]] = None
+
+    def next_departure(self, timestamp: int) -> Departure:
+        """
+        Return the first departure at or after timestamp; ties go to the first bus listed.
+        """
+        bus = min(self.busses, key=lambda bus: -timestamp % bus)
+        return Departure(bus, timestamp + -timestamp % bus)
+
+    def next_departures(self, timestamps: Sequence[int]) -> tuple[Any, Any]:
+        """
+        Return the busses and the times of the first departure at or after each timestamp.
+
+        Both are NumPy arrays when NumPy is installed and lists otherwise.
+        Waits are computed one bus at a time over the whole batch, so memory
+        stays proportional to the number of timestamps.
+        """
+        values = self._as_int64(timestamps)
+        if values is None:
+            departures = [self.next_departure(timestamp) for timestamp in timestamps]
+            return (
+                _as_batch([departure.bus for departure in departures]),
+                _as_batch([departure.timestamp for departure in departures]),
+            )
+        best_bus = np.full(len(values), self.busses[0], dtype=np.int64)
+        best_wait = -values % self.busses[0]
+        for bus in self.busses[1:]:
+            wait = -values % bus
+            earlier = wait < best_wait
+            best_bus[earlier] = bus
+            np.minimum(best_wait, wait, out=best_wait)
+        return best_bus, values + best_wait
+
+    def _as_int64(self, timestamps: Sequence[int]) -> Any:
+        """
+        Return timestamps as an int64 array, or None if NumPy is missing or a departure would overflow.
+        """
+        if np is None:
+            return None
+        try:
+            values = np.asarray(timestamps, dtype=np.int64)
+        except OverflowError:
+            return None
+        if len(values) and (
+            values.min() < 0 or values.max() > INT64_MAX - max(self.busses)
+        ):
+            return None
+        return values
+
+    def lattice(self) -> tuple[int, int]:
+        """
+        Return the (remainder, period) of every timestamp at which the busses depart as listed.
+        """
+        if self._lattice is None:
+            self._lattice = solve_congruences(
+                (-offset % bus, bus) for (bus, offset) in self.constraints
+            )
+        return self._lattice
+
+    def alignment(self, lower_bound: int = 0) -> Lattice:
+        """
+        Return every timestamp from lower_bound on at which the busses depart consecutively as listed.
+        """
+        remainder, period = self.lattice()
+        return Lattice(lower_bound + (remainder - lower_bound) % period, period)
+
+    def alignments(self, lower_bounds: Sequence[int]) -> Any:
+        """
+        Return the first aligned timestamp at or after each lower bound.
+
+        The result is a NumPy array when NumPy is installed and a list otherwise.
+        """
+        remainder, period = self.lattice()
+        values = self._as_int64(lower_bounds)
+        if values is None or period > INT64_MAX - int(values.max(initial=0)):
+            return _as_batch(
+                [
+                    lower_bound + (remainder - lower_bound) % period
+                    for lower_bound in lower_bounds
+                ]
+            )
+        return values + (remainder - values) % period
+
+
+def benchmark(queries: int = 10**6, bits: int = 60) -> None:
+    """
+    Time next_departure in a loop against next_departures on random timestamps below 2 ** bits.
+    """
+    from input_thirteen import input_
+
+    schedule = Schedule(input_[1])
+    random = Random(0)
+    timestamps = [random.getrandbits(bits) for _ in range(queries)]
+    start = time.perf_counter()
+    expected = [schedule.next_departure(timestamp) for timestamp in timestamps]
+    looped = time.perf_counter() - start
+    start = time.perf_counter()
+    busses, departures = schedule.next_departures(timestamps)
+    batched = time.perf_counter() - start
+    assert [tuple(departure) for departure in expected] == list(
+        zip(map(int, busses), map(int, departures))
+    )
+    start = time.perf_counter()
+    aligned = schedule.alignments(timestamps)
+    aligning = time.perf_counter() - start
+    assert int(aligned[-1]) == schedule.alignment(timestamps[-1]).timestamp
+    print(
+        f"{queries:,} timestamps below 2**{bits}: next_departure {looped:.3f}s,"
+        f" next_departures {batched:.3f}s, alignments {aligning:.3f}s"
+    )
 
 
 if __name__ == "__main__":
@@ -211,8 +414,90 @@ if __name__ == "__main__":
     verify(1261476, part_two("67,7,x,59,61"))
     verify(1202161486, part_two("1789,37,47,1889"))
 
+    verify([(7, 0), (13, 1), (59, 4), (31, 6), (19, 7)], parse_constraints(busses))
+    verify(Lattice(1068781, 7 * 13 * 59 * 31 * 19), bus_lattice(busses))
+    congruences = [(-offset % bus, bus) for (bus, offset) in parse_constraints(busses)]
+    verify(solve_congruences(congruences), sieve(congruences))
+    lattice = bus_lattice(busses, 100_000_000_000_000)
+    verify(True, lattice.timestamp - lattice.period < 100_000_000_000_000)
+    verify(
+        True,
+        all(
+            (lattice.timestamp + offset) % bus == 0
+            for (bus, offset) in parse_constraints(busses)
+        ),
+    )
+    verify(1068781, part_two(busses, 1068781))
+    verify(1068781 + lattice.period, part_two(busses, 1068782))
+    # 4 and 6 share a factor of 2, so the solutions repeat every 12 minutes.
+    verify(Lattice(4, 12), bus_lattice("4,x,6"))
+    verify(Lattice(16, 12), bus_lattice("4,x,6", 5))
+    for inconsistent in ("4,6", "6,x,9"):
+        try:
+            bus_lattice(inconsistent)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{inconsistent} was solved")
+    try:
+        sieve([(0, 4), (4, 6)])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Sieved moduli that are not coprime")
+    verify(Lattice(0, 1), bus_lattice("x,x"))
+
+    schedule = Schedule(busses)
+    verify(Departure(59, 944), schedule.next_departure(939))
+    verify(Departure(7, 945), schedule.next_departure(945))
+    verify(Departure(7, 0), schedule.next_departure(0))
+    batch = schedule.next_departures([939, 945, 0, 931])
+    verify(
+        ([59, 7, 7, 7], [944, 945, 0, 931]),
+        tuple(list(map(int, values)) for values in batch),
+    )
+    # 2 ** 60 + 1 has no exact float, so a float ceiling would be off by one.
+    huge = 2**60 + 1
+    verify(huge + -huge % 59, Schedule("59").next_departure(huge).timestamp)
+    verify(calculate_wait(str(huge), 59), -huge % 59)
+    verify(
+        [
+            Schedule("x,59").next_departure(timestamp).timestamp
+            for timestamp in (huge, 2**70)
+        ],
+        list(map(int, Schedule("x,59").next_departures([huge, 2**70])[1])),
+    )
+    batch_type = list if np is None else np.ndarray
+    for results in (
+        *Schedule("x,59").next_departures([huge]),
+        *Schedule("x,59").next_departures([huge, 2**70]),
+        schedule.alignments([0]),
+        schedule.alignments([2**70]),
+    ):
+        verify(batch_type, type(results))
+    verify(Lattice(1068781, 7 * 13 * 59 * 31 * 19), schedule.alignment())
+    verify(bus_lattice(busses, 10**14), schedule.alignment(10**14))
+    verify(
+        [
+            bus_lattice(busses, bound).timestamp
+            for bound in (0, 1068781, 1068782, 2**62)
+        ],
+        list(map(int, schedule.alignments([0, 1068781, 1068782, 2**62]))),
+    )
+
     from input_thirteen import input_
 
     now, busses = input_
     print("Part one: ", part_one(now, busses))
-    print("Part two: ", part_two(busses))
\ No newline at end of file
+    print("Part two: ", part_two(busses))
+    congruences = [(-offset % bus, bus) for (bus, offset) in parse_constraints(busses)]
+    verify(part_two(busses), sieve(congruences)[0])
+    schedule = Schedule(busses)
+    verify(
+        int(now) + calculate_wait(now, pick_bus(now, busses)),
+        schedule.next_departure(int(now)).timestamp,
+    )
+    verify(part_two(busses), schedule.alignment().timestamp)
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
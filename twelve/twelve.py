@@ -38,10 +38,14 @@ At the end of these instructions, the ship's Manhattan distance (sum of the abso
 Figure out where the navigation instructions lead. What is the Manhattan distance between that location and the ship's starting position?
 """
 
-from typing import Any, NamedTuple, Sequence
+from array import array
+from random import Random
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Sequence
 
 import itertools
 import operator
+import sys
+import time
 
 
 def part_one(instructions: Sequence[str], facing: str = "E") -> int:
@@ -198,6 +202,536 @@ def rotate_waypoint(*, state: State, action: str, units: int) -> State:
     return State(ship=state.ship, waypoint=Position(x=x, y=y))
 
 
+NORTH, EAST, SOUTH, WEST, TURN, FORWARD = range(6)
+MOVES = {"N": NORTH, "E": EAST, "S": SOUTH, "W": WEST}
+HEADINGS = "NESW"
+# The unit step of NORTH, EAST, SOUTH and WEST, which double as headings.
+STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+# (a, b, c, d) turns (x, y) into (a * x + b * y, c * x + d * y) for 0 to 3
+# clockwise quarter turns.
+ROTATIONS = ((1, 0, 0, 1), (0, 1, -1, 0), (-1, 0, 0, -1), (0, -1, 1, 0))
+
+
+class Route(NamedTuple):
+    """
+    Navigation instructions decoded into parallel opcode and argument arrays.
+
+    N, E, S and W keep their distance as the argument. L and R become TURN
+    with the number of clockwise quarter turns, from 0 to 3, as the argument.
+    """
+
+    opcodes: bytes
+    arguments: array
+
+
+def decode(instruction: str) -> tuple[int, int]:
+    """
+    Return the opcode and argument of one instruction.
+    """
+    action = instruction[0]
+    units = int(instruction[1:])
+    if action in MOVES:
+        return MOVES[action], units
+    if action == "F":
+        return FORWARD, units
+    if action in "LR":
+        if units % 90:
+            raise ValueError(f"Cannot turn by {units} degrees: {instruction}")
+        return TURN, (units // 90 if action == "R" else -units // 90) % 4
+    raise ValueError(f"Unknown action: {instruction}")
+
+
+def compile_route(instructions: Sequence[str]) -> Route:
+    opcodes = bytearray()
+    arguments = array("q")
+    for instruction in instructions:
+        opcode, argument = decode(instruction)
+        opcodes.append(opcode)
+        arguments.append(argument)
+    return Route(bytes(opcodes), arguments)
+
+
+def navigate(
+    route: Route, facing: str = "E", waypoint: Position = Position(x=10, y=1)
+) -> tuple[Position, Position]:
+    """
+    Return where the ship ends up under the part one rules and under the part two rules.
+
+    Both rulesets run in the same pass over the route. The heading is an index
+    into STEPS and turning the waypoint is a lookup in ROTATIONS, so no
+    instruction loops over its quarter turns or allocates.
+    """
+    heading = HEADINGS.index(facing)
+    x = y = 0
+    ship_x = ship_y = 0
+    waypoint_x, waypoint_y = waypoint
+    for opcode, argument in zip(route.opcodes, route.arguments):
+        if opcode == FORWARD:
+            step_x, step_y = STEPS[heading]
+            x += step_x * argument
+            y += step_y * argument
+            ship_x += waypoint_x * argument
+            ship_y += waypoint_y * argument
+        elif opcode == TURN:
+            heading = (heading + argument) & 3
+            a, b, c, d = ROTATIONS[argument]
+            waypoint_x, waypoint_y = (
+                a * waypoint_x + b * waypoint_y,
+                c * waypoint_x + d * waypoint_y,
+            )
+        else:
+            step_x, step_y = STEPS[opcode]
+            x += step_x * argument
+            y += step_y * argument
+            waypoint_x += step_x * argument
+            waypoint_y += step_y * argument
+    return Position(x=x, y=y), Position(x=ship_x, y=ship_y)
+
+
+class Affine(NamedTuple):
+    """
+    An integer affine map of a part two state (ship.x, ship.y, waypoint.x, waypoint.y).
+
+    matrix is the 4x4 linear part in row-major order and offset is added
+    after it. Together they are the homogeneous 5x5 matrix with (0, 0, 0, 0,
+    1) as its last row, so composing maps is matrix multiplication.
+    """
+
+    matrix: tuple[int, ...]
+    offset: tuple[int, ...]
+
+    def apply(self, state: State) -> State:
+        vector = (*state.ship, *state.waypoint)
+        matrix = self.matrix
+        x, y, waypoint_x, waypoint_y = (
+            sum(matrix[row * 4 + col] * vector[col] for col in range(4))
+            + self.offset[row]
+            for row in range(4)
+        )
+        return State(
+            ship=Position(x=x, y=y), waypoint=Position(x=waypoint_x, y=waypoint_y)
+        )
+
+
+IDENTITY = Affine(
+    matrix=(1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1), offset=(0, 0, 0, 0)
+)
+
+
+def compose(first: Affine, second: Affine) -> Affine:
+    """
+    Return the map that applies first and then second.
+    """
+    outer, inner = second.matrix, first.matrix
+    matrix = tuple(
+        outer[row * 4] * inner[col]
+        + outer[row * 4 + 1] * inner[4 + col]
+        + outer[row * 4 + 2] * inner[8 + col]
+        + outer[row * 4 + 3] * inner[12 + col]
+        for row in range(4)
+        for col in range(4)
+    )
+    offset = tuple(
+        outer[row * 4] * first.offset[0]
+        + outer[row * 4 + 1] * first.offset[1]
+        + outer[row * 4 + 2] * first.offset[2]
+        + outer[row * 4 + 3] * first.offset[3]
+        + second.offset[row]
+        for row in range(4)
+    )
+    return Affine(matrix, offset)
+
+
+def power(transform: Affine, exponent: int) -> Affine:
+    """
+    Return transform applied exponent times, by repeated squaring.
+    """
+    if exponent < 0:
+        raise ValueError(f"Cannot invert a transform: {exponent}")
+    result = IDENTITY
+    while exponent:
+        if exponent & 1:
+            result = compose(result, transform)
+        transform = compose(transform, transform)
+        exponent >>= 1
+    return result
+
+
+def instruction_transform(opcode: int, argument: int) -> Affine:
+    """
+    Return the part two state map of one compiled instruction.
+    """
+    matrix = list(IDENTITY.matrix)
+    offset = [0, 0, 0, 0]
+    if opcode == FORWARD:
+        matrix[2] = matrix[7] = argument
+    elif opcode == TURN:
+        matrix[10], matrix[11], matrix[14], matrix[15] = ROTATIONS[argument]
+    else:
+        step_x, step_y = STEPS[opcode]
+        offset[2] = step_x * argument
+        offset[3] = step_y * argument
+    return Affine(tuple(matrix), tuple(offset))
+
+
+def fold(route: Route) -> Affine:
+    """
+    Return the single map equivalent to following the whole route under the part two rules.
+    """
+    transform = IDENTITY
+    for opcode, argument in zip(route.opcodes, route.arguments):
+        transform = compose(transform, instruction_transform(opcode, argument))
+    return transform
+
+
+def replay(
+    route: Route,
+    repetitions: int,
+    state: State = State(ship=Position(x=0, y=0), waypoint=Position(x=10, y=1)),
+) -> State:
+    """
+    Return the state after following the route repetitions times under the part two rules.
+    """
+    return power(fold(route), repetitions).apply(state)
+
+
+class RouteSegments:
+    """
+    A segment tree of part two state maps over a compiled route.
+
+    Leaf i holds the map of instruction i and every other node the
+    composition of its children, left first. Composition is not commutative,
+    so a query composes the nodes it collects from the left edge and from
+    the right edge separately and joins them at the end. Building takes
+    O(n) compositions and each query O(log n).
+    """
+
+    def __init__(self, route: Route):
+        self.length = len(route.opcodes)
+        self.tree = [IDENTITY] * self.length + [
+            instruction_transform(opcode, argument)
+            for opcode, argument in zip(route.opcodes, route.arguments)
+        ]
+        for node in range(self.length - 1, 0, -1):
+            self.tree[node] = compose(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def __len__(self) -> int:
+        return self.length
+
+    def transform(self, start: int, stop: int) -> Affine:
+        """
+        Return the map of instructions start to stop - 1.
+        """
+        if not 0 <= start <= stop <= self.length:
+            raise IndexError(f"Invalid range: [{start}, {stop})")
+        left = right = IDENTITY
+        start += self.length
+        stop += self.length
+        while start < stop:
+            if start & 1:
+                left = compose(left, self.tree[start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                right = compose(self.tree[stop], right)
+            start >>= 1
+            stop >>= 1
+        return compose(left, right)
+
+    def state(
+        self,
+        start: int,
+        stop: int,
+        state: State = State(ship=Position(x=0, y=0), waypoint=Position(x=10, y=1)),
+    ) -> State:
+        """
+        Return the state after following instructions start to stop - 1 from state.
+        """
+        return self.transform(start, stop).apply(state)
+
+
+class Telemetry(NamedTuple):
+    """
+    The ship and waypoint after step instructions; step 0 is the starting position.
+
+    Under the part one rules the waypoint is the unit step of the ship's heading.
+    """
+
+    step: int
+    ship: Position
+    waypoint: Position
+
+
+class TrajectoryAggregate:
+    """
+    The bounding box of a trajectory and its farthest point, kept in constant memory.
+
+    Pass one to part_one_trajectory or part_two_trajectory to have it updated
+    at every step, including the starting position and the steps that
+    decimation does not yield. The bounds are None until the first update.
+    """
+
+    def __init__(self) -> None:
+        self.steps = 0
+        self.min_x: Optional[int] = None
+        self.max_x: Optional[int] = None
+        self.min_y: Optional[int] = None
+        self.max_y: Optional[int] = None
+        self.max_distance: Optional[int] = None
+        self.max_distance_step = 0
+
+    def update(self, step: int, x: int, y: int) -> None:
+        self.steps = step
+        distance = abs(x) + abs(y)
+        if self.max_distance is None:
+            self.min_x = self.max_x = x
+            self.min_y = self.max_y = y
+            self.max_distance = distance
+            self.max_distance_step = step
+            return
+        if x < self.min_x:
+            self.min_x = x
+        elif x > self.max_x:
+            self.max_x = x
+        if y < self.min_y:
+            self.min_y = y
+        elif y > self.max_y:
+            self.max_y = y
+        if distance > self.max_distance:
+            self.max_distance = distance
+            self.max_distance_step = step
+
+    @property
+    def bounding_box(self) -> tuple[Position, Position]:
+        if self.max_distance is None:
+            raise ValueError("No positions have been recorded.")
+        return Position(x=self.min_x, y=self.min_y), Position(
+            x=self.max_x, y=self.max_y
+        )
+
+
+def part_one_trajectory(
+    instructions: Iterable[str],
+    facing: str = "E",
+    every: int = 1,
+    aggregate: Optional[TrajectoryAggregate] = None,
+) -> Iterator[Telemetry]:
+    """
+    Lazily yield the ship's position under the part one rules.
+
+    Instructions are decoded as they are consumed, so neither the instructions
+    nor the trajectory need to fit in memory. Only the start, every
+    every-th step and the final step are yielded.
+    """
+    if every < 1:
+        raise ValueError(f"every must be positive: {every}")
+    heading = HEADINGS.index(facing)
+    x = y = 0
+    step = 0
+    if aggregate is not None:
+        aggregate.update(step, x, y)
+    yield Telemetry(step, Position(x=x, y=y), Position(*STEPS[heading]))
+    for step, instruction in enumerate(instructions, 1):
+        opcode, argument = decode(instruction)
+        if opcode == TURN:
+            heading = (heading + argument) & 3
+        else:
+            step_x, step_y = STEPS[heading if opcode == FORWARD else opcode]
+            x += step_x * argument
+            y += step_y * argument
+            if aggregate is not None:
+                aggregate.update(step, x, y)
+        if not step % every:
+            yield Telemetry(step, Position(x=x, y=y), Position(*STEPS[heading]))
+    if step % every:
+        yield Telemetry(step, Position(x=x, y=y), Position(*STEPS[heading]))
+    if aggregate is not None:
+        aggregate.steps = step
+
+
+def part_two_trajectory(
+    instructions: Iterable[str],
+    state: State = State(ship=Position(x=0, y=0), waypoint=Position(x=10, y=1)),
+    every: int = 1,
+    aggregate: Optional[TrajectoryAggregate] = None,
+) -> Iterator[Telemetry]:
+    """
+    Lazily yield the ship and waypoint under the part two rules.
+
+    Like part_one_trajectory, only the start, every every-th step and the
+    final step are yielded.
+    """
+    if every < 1:
+        raise ValueError(f"every must be positive: {every}")
+    (x, y), (waypoint_x, waypoint_y) = state
+    step = 0
+    if aggregate is not None:
+        aggregate.update(step, x, y)
+    yield Telemetry(step, state.ship, state.waypoint)
+    for step, instruction in enumerate(instructions, 1):
+        opcode, argument = decode(instruction)
+        if opcode == FORWARD:
+            x += waypoint_x * argument
+            y += waypoint_y * argument
+            if aggregate is not None:
+                aggregate.update(step, x, y)
+        elif opcode == TURN:
+            a, b, c, d = ROTATIONS[argument]
+            waypoint_x, waypoint_y = (
+                a * waypoint_x + b * waypoint_y,
+                c * waypoint_x + d * waypoint_y,
+            )
+        else:
+            step_x, step_y = STEPS[opcode]
+            waypoint_x += step_x * argument
+            waypoint_y += step_y * argument
+        if not step % every:
+            yield Telemetry(
+                step, Position(x=x, y=y), Position(x=waypoint_x, y=waypoint_y)
+            )
+    if step % every:
+        yield Telemetry(step, Position(x=x, y=y), Position(x=waypoint_x, y=waypoint_y))
+    if aggregate is not None:
+        aggregate.steps = step
+
+
+def random_instruction_stream(length: int, seed: int = 0) -> Iterator[str]:
+    """
+    Lazily yield length random navigation instructions with the same mix of actions as a real route.
+    """
+    random = Random(seed)
+    for _ in range(length):
+        action = random.choices("NESWLRF", weights=(1, 1, 1, 1, 1, 1, 2))[0]
+        if action in "LR":
+            yield f"{action}{random.choice((90, 180, 270))}"
+        else:
+            yield f"{action}{random.randint(1, 100)}"
+
+
+def random_instructions(length: int, seed: int = 0) -> list[str]:
+    return list(random_instruction_stream(length, seed))
+
+
+def random_route(length: int, seed: int = 0) -> Route:
+    """
+    Return a compiled route like compile_route(random_instructions(length, seed)), built without strings.
+    """
+    random = Random(seed)
+    opcodes = bytes(
+        random.choices(
+            (NORTH, EAST, SOUTH, WEST, TURN, FORWARD),
+            weights=(1, 1, 1, 1, 2, 2),
+            k=length,
+        )
+    )
+    arguments = array(
+        "q",
+        (
+            random.randint(1, 3) if opcode == TURN else random.randint(1, 100)
+            for opcode in opcodes
+        ),
+    )
+    return Route(opcodes, arguments)
+
+
+def benchmark(length: int = 10**6, route_length: int = 10**7) -> None:
+    """
+    Time part_one and part_two against navigate on length instructions, then navigate alone on route_length.
+    """
+    instructions = random_instructions(length)
+    start = time.perf_counter()
+    expected = (part_one(instructions), part_two(instructions))
+    separate = time.perf_counter() - start
+    start = time.perf_counter()
+    route = compile_route(instructions)
+    compiled = time.perf_counter() - start
+    start = time.perf_counter()
+    ships = navigate(route)
+    navigated = time.perf_counter() - start
+    assert expected == tuple(ship.manhattan_distance_from_origin for ship in ships)
+    print(
+        f"{length:,} instructions: part_one + part_two {separate:.3f}s,"
+        f" compile_route {compiled:.3f}s + navigate {navigated:.3f}s"
+    )
+    route = random_route(route_length)
+    start = time.perf_counter()
+    navigate(route)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{route_length:,} instructions: navigate {elapsed:.3f}s,"
+        f" {route_length / elapsed:,.0f} instructions/s"
+    )
+
+
+def benchmark_transforms(
+    length: int = 10**5, queries: int = 10**4, repetitions: int = 10**6
+) -> None:
+    """
+    Time RouteSegments range queries against navigating each range, and replay against repeated navigation.
+    """
+    route = random_route(length)
+    start = time.perf_counter()
+    segments = RouteSegments(route)
+    built = time.perf_counter() - start
+    random = Random(0)
+    ranges = [sorted(random.sample(range(length + 1), 2)) for _ in range(queries)]
+    start = time.perf_counter()
+    states = [segments.state(first, last) for first, last in ranges]
+    queried = time.perf_counter() - start
+    sample = ranges[: max(1, queries // 100)]
+    start = time.perf_counter()
+    expected = [
+        navigate(Route(route.opcodes[first:last], route.arguments[first:last]))[1]
+        for first, last in sample
+    ]
+    navigated = (time.perf_counter() - start) * queries / len(sample)
+    assert expected == [state.ship for state in states[: len(sample)]]
+    print(
+        f"{queries:,} ranges of {length:,} instructions: build {built:.3f}s +"
+        f" queries {queried:.3f}s, navigate (extrapolated) {navigated:.3f}s"
+    )
+
+    route = random_route(1_000)
+    passes = 1_000
+    start = time.perf_counter()
+    expected_ship = navigate(Route(route.opcodes * passes, route.arguments * passes))[1]
+    navigated = time.perf_counter() - start
+    start = time.perf_counter()
+    assert expected_ship == replay(route, passes).ship
+    replayed = time.perf_counter() - start
+    start = time.perf_counter()
+    ship = replay(route, repetitions).ship
+    elapsed = time.perf_counter() - start
+    print(
+        f"1,000 instructions x {passes:,}: navigate {navigated:.3f}s, replay {replayed:.3f}s;"
+        f" x {repetitions:,}: replay {elapsed:.3f}s, distance"
+        f" {ship.manhattan_distance_from_origin:,}"
+    )
+
+
+def benchmark_trajectory(length: int = 10**6, every: int = 10**4) -> None:
+    """
+    Stream a trajectory of length random instructions with an aggregate, never holding the route in memory.
+    """
+    aggregate = TrajectoryAggregate()
+    start = time.perf_counter()
+    points = 0
+    for points, telemetry in enumerate(
+        part_two_trajectory(
+            random_instruction_stream(length), every=every, aggregate=aggregate
+        ),
+        1,
+    ):
+        pass
+    elapsed = time.perf_counter() - start
+    low, high = aggregate.bounding_box
+    print(
+        f"{length:,} instructions, {points:,} points: {elapsed:.3f}s, bounding box"
+        f" {tuple(low)} to {tuple(high)}, farthest {aggregate.max_distance:,} at step"
+        f" {aggregate.max_distance_step:,}"
+    )
+
+
 if __name__ == "__main__":
 
     def verify(expected: Any, actual: Any) -> None:
@@ -240,7 +774,150 @@ if __name__ == "__main__":
     verify(25, part_one(diagnostic))
     verify(286, part_two(diagnostic))
 
+    route = compile_route(diagnostic)
+    verify(bytes([FORWARD, NORTH, FORWARD, TURN, FORWARD]), route.opcodes)
+    verify([10, 3, 7, 1, 11], list(route.arguments))
+    verify([3, 2, 1, 0], list(compile_route(["L90", "L180", "R90", "L360"]).arguments))
+    verify(
+        (Position(x=17, y=-8), Position(x=214, y=-72)),
+        navigate(route),
+    )
+    for instructions in (["R90", "F5"], ["L270", "F5"], ["R180", "S2", "F1"]):
+        verify(
+            (part_one(instructions), part_two(instructions)),
+            tuple(
+                ship.manhattan_distance_from_origin
+                for ship in navigate(compile_route(instructions))
+            ),
+        )
+    try:
+        compile_route(["R45"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("R45 compiled")
+    verify(
+        [
+            Telemetry(0, Position(x=0, y=0), Position(x=10, y=1)),
+            Telemetry(1, Position(x=100, y=10), Position(x=10, y=1)),
+            Telemetry(2, Position(x=100, y=10), Position(x=10, y=4)),
+            Telemetry(3, Position(x=170, y=38), Position(x=10, y=4)),
+            Telemetry(4, Position(x=170, y=38), Position(x=4, y=-10)),
+            Telemetry(5, Position(x=214, y=-72), Position(x=4, y=-10)),
+        ],
+        list(part_two_trajectory(diagnostic)),
+    )
+    verify(
+        [
+            Telemetry(0, Position(x=0, y=0), Position(x=1, y=0)),
+            Telemetry(2, Position(x=10, y=3), Position(x=1, y=0)),
+            Telemetry(4, Position(x=17, y=3), Position(x=0, y=-1)),
+            Telemetry(5, Position(x=17, y=-8), Position(x=0, y=-1)),
+        ],
+        list(part_one_trajectory(diagnostic, every=2)),
+    )
+    verify(
+        [0, 5],
+        [telemetry.step for telemetry in part_two_trajectory(diagnostic, every=5)],
+    )
+    verify([0], [telemetry.step for telemetry in part_two_trajectory([], every=3)])
+    aggregate = TrajectoryAggregate()
+    verify(
+        2,
+        len(list(part_two_trajectory(iter(diagnostic), every=10, aggregate=aggregate))),
+    )
+    verify(5, aggregate.steps)
+    verify((Position(x=0, y=-72), Position(x=214, y=38)), aggregate.bounding_box)
+    verify((286, 5), (aggregate.max_distance, aggregate.max_distance_step))
+    aggregate = TrajectoryAggregate()
+    start_state = State(ship=Position(x=100, y=100), waypoint=Position(x=1, y=1))
+    verify(2, len(list(part_two_trajectory(["F1"], start_state, aggregate=aggregate))))
+    verify((Position(x=100, y=100), Position(x=101, y=101)), aggregate.bounding_box)
+    verify((202, 1), (aggregate.max_distance, aggregate.max_distance_step))
+    aggregate = TrajectoryAggregate()
+    list(part_one_trajectory(["S3", "E2"], aggregate=aggregate))
+    verify((Position(x=0, y=-3), Position(x=2, y=0)), aggregate.bounding_box)
+    verify((5, 2), (aggregate.max_distance, aggregate.max_distance_step))
+    aggregate = TrajectoryAggregate()
+    list(part_two_trajectory([], start_state, aggregate=aggregate))
+    verify((Position(x=100, y=100), Position(x=100, y=100)), aggregate.bounding_box)
+    verify((200, 0), (aggregate.max_distance, aggregate.max_distance_step))
+
+    transform = fold(compile_route(diagnostic))
+    start_state = State(ship=Position(x=0, y=0), waypoint=Position(x=10, y=1))
+    verify(
+        State(ship=Position(x=214, y=-72), waypoint=Position(x=4, y=-10)),
+        transform.apply(start_state),
+    )
+    verify(IDENTITY, power(transform, 0))
+    verify(compose(compose(transform, transform), transform), power(transform, 3))
+    verify(
+        part_two(diagnostic * 5),
+        replay(compile_route(diagnostic), 5).ship.manhattan_distance_from_origin,
+    )
+    route = random_route(200, seed=2)
+    segments = RouteSegments(route)
+    for first, last in ((0, 200), (0, 0), (13, 14), (5, 150), (199, 200), (64, 128)):
+        state = start_state
+        for opcode, argument in zip(
+            route.opcodes[first:last], route.arguments[first:last]
+        ):
+            state = instruction_transform(opcode, argument).apply(state)
+        verify(state, segments.state(first, last))
+        verify(
+            navigate(Route(route.opcodes[first:last], route.arguments[first:last]))[1],
+            segments.state(first, last).ship,
+        )
+    verify(fold(route), segments.transform(0, len(segments)))
+
+    route = random_route(1_000, seed=1)
+    verify(
+        navigate(route),
+        navigate(
+            compile_route(
+                [
+                    f"{'NESWRF'[opcode]}{argument * 90 if opcode == TURN else argument}"
+                    for opcode, argument in zip(route.opcodes, route.arguments)
+                ]
+            )
+        ),
+    )
+
     from input_twelve import input_
 
     print("Part one: ", part_one(input_))
-    print("Part two: ", part_two(input_))
\ No newline at end of file
+    print("Part two: ", part_two(input_))
+    verify(
+        (part_one(input_), part_two(input_)),
+        tuple(
+            ship.manhattan_distance_from_origin
+            for ship in navigate(compile_route(input_))
+        ),
+    )
+    for telemetry in part_one_trajectory(input_):
+        pass
+    verify(part_one(input_), telemetry.ship.manhattan_distance_from_origin)
+    aggregate = TrajectoryAggregate()
+    for telemetry in part_two_trajectory(input_, every=100, aggregate=aggregate):
+        pass
+    verify(part_two(input_), telemetry.ship.manhattan_distance_from_origin)
+    verify(len(input_), telemetry.step)
+    verify(
+        max(
+            telemetry.ship.manhattan_distance_from_origin
+            for telemetry in part_two_trajectory(input_)
+        ),
+        aggregate.max_distance,
+    )
+    verify(
+        (part_one(random_instructions(1_000)), part_two(random_instructions(1_000))),
+        tuple(
+            ship.manhattan_distance_from_origin
+            for ship in navigate(compile_route(random_instructions(1_000)))
+        ),
+    )
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        benchmark_transforms()
+        benchmark_trajectory()